@@ -1,14 +1,67 @@
 import argparse
 import os
+import sys
 from lib.ResourceAnalyzer import Resource
+from lib.BatchRunner import run_batch, find_resources, discover, import_candidates
+from lib.Imports import ImportResolver
+from lib.Watcher import Watcher
+from lib.TemplateRenderer import TemplateRenderer
+from lib.Profiler import PROFILER
+import cProfile
+from lib.ParseCache import ParseCache, DEFAULT_CACHE_DIR
+from lib.SymbolIndex import SymbolIndex, DEFAULT_INDEX_PATH
+from lib.JsonExport import RecordStream, FORMATS
+from lib.ArchiveWriter import ArchiveWriter, ARCHIVE_SUFFIXES
 import re
 
 SUCCESS = '\u2705'  # Check mark
 FAILURE = '\u274C'  # Cross mark
 
 parser = argparse.ArgumentParser(description='Rename files in a directory.')
-parser.add_argument('path', type=str, help='Path to the directory containing the files')
+parser.add_argument('path', type=str, nargs='?', help='Path to the directory containing the files')
+parser.add_argument('--batch', action='store_true', help='Treat path as a server root and build every resource found under it')
+parser.add_argument('-j', '--jobs', type=int, default=None, help='Worker processes for --batch (default: all cores)')
+parser.add_argument('--summary', type=str, default=None, help='Where --batch writes its JSON summary (default: export/summary.json)')
+parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR, help=f'Where parse results are cached between runs (default: {DEFAULT_CACHE_DIR})')
+parser.add_argument('--no-cache', action='store_true', help='Parse everything from scratch and leave the cache alone')
+parser.add_argument('--watch', action='store_true', help='Keep running and regenerate docs for whatever changes')
+parser.add_argument('--interval', type=float, default=0.25, help='Seconds between --watch polls (default: 0.25)')
+parser.add_argument('--templates', type=str, default=None, help='Folder of event.mdx/callback.mdx/export.mdx templates overriding the bundled ones')
+parser.add_argument('--profile', nargs='?', type=int, const=15, default=None, metavar='N', help='Print per-phase timings and the N slowest files/phases (default N: 15)')
+parser.add_argument('--trace-json', type=str, default=None, help='Write a Chrome trace-event file of every phase')
+parser.add_argument('--cprofile', type=str, default=None, help='Also capture a cProfile of this process into the given file')
+parser.add_argument('--index', nargs='?', type=str, const=DEFAULT_INDEX_PATH, default=None, metavar='DB', help=f'Keep a SQLite index of symbols and call sites and list "used by" on each page (default DB: {DEFAULT_INDEX_PATH})')
+parser.add_argument('--query', type=str, default=None, metavar='NAME', help='Print where an event, callback or resource:export is defined and used, from the --index DB, without building anything')
+parser.add_argument('--only', type=str, default=None, metavar='KINDS', help=f'Comma separated sections to build, any of {",".join(Resource.SECTIONS)} (default: all)')
+parser.add_argument('--side', type=str, default=None, metavar='SIDES', help=f'Comma separated sides to build, any of {",".join(Resource.SIDES)} (default: all)')
+parser.add_argument('--format', type=str, choices=FORMATS, default='mdx', help='mdx docs pages, or every symbol as one json document / one ndjson record per line (default: mdx)')
+parser.add_argument('--output', type=str, default=None, metavar='FILE', help='With --format json/ndjson, stream all records into FILE (- for stdout) instead of a symbols file per resource')
+parser.add_argument('--language', type=str, default=None, metavar='LANG', help='Locale the docs render locale() help texts in, e.g. de (default: en / en-us)')
+parser.add_argument('--locales', action='store_true', help='Report the locale keys the scripts use that a language lacks, and the ones nothing uses')
+parser.add_argument('--serve', nargs='?', type=str, const=True, default=None, metavar='ADDR', help='Keep every resource under path parsed in memory and answer JSON queries on ADDR, unix:PATH or http://HOST:PORT (default: http://127.0.0.1:8765)')
+parser.add_argument('--archive', type=str, default=None, metavar='FILE', help=f'Stream every page into one reproducible archive instead of export/, any of {", ".join(ARCHIVE_SUFFIXES)}')
 args = parser.parse_args()
+if args.query is None and args.path is None:
+    parser.error('path is required unless --query is given')
+
+def parse_choices(value: str, choices: tuple[str, ...], option: str):
+    if value is None:
+        return None
+    picked = tuple(part.strip() for part in value.split(',') if part.strip())
+    unknown = [part for part in picked if part not in choices]
+    if unknown or not picked:
+        parser.error(f'{option} takes a comma separated list of {", ".join(choices)}, got {value!r}')
+    return picked
+
+if args.output and args.format == 'mdx':
+    parser.error('--output needs --format json or ndjson')
+if args.archive and not args.archive.endswith(ARCHIVE_SUFFIXES):
+    parser.error(f'--archive takes a file ending in one of {", ".join(ARCHIVE_SUFFIXES)}')
+if args.archive and (args.output or args.watch or args.serve):
+    parser.error('--archive can\'t be combined with --output, --watch or --serve')
+
+args.only = parse_choices(args.only, Resource.SECTIONS, '--only')
+args.side = parse_choices(args.side, Resource.SIDES, '--side')
 
 def validate_args():
     if args.path == '.':
@@ -23,6 +76,10 @@ def validate_args():
         print(f'Error checking path: {e}')
         exit(1)
 
+    if args.batch or args.serve:
+        print(f'Root: {args.path}')
+        return
+
     if not os.path.exists(os.path.join(args.path, 'fxmanifest.lua')):
         print(f'{FAILURE} fxmanifest.lua found in the directory.')
         exit(1)
@@ -30,13 +87,136 @@ def validate_args():
     print(f'Path: {args.path}')
     print(f'{SUCCESS} fxmanifest.lua found in the directory.')
 
+def query_index():
+    index_path = args.index or DEFAULT_INDEX_PATH
+    if not os.path.exists(index_path):
+        print(f'{FAILURE} no symbol index at {index_path}, build one with --index first.')
+        exit(1)
+
+    with SymbolIndex(index_path) as index:
+        definitions = index.definitions(args.query)
+        calls = index.lookup(args.query)
+
+    for kind, resource, relative, line, side in definitions:
+        print(f'defined  {kind:<9}{resource}/{relative}:{line} ({side})')
+    for kind, via, resource, relative, line in calls:
+        print(f'used     {kind:<9}{resource}/{relative}:{line} ({via})')
+    if not definitions and not calls:
+        print(f'{FAILURE} {args.query} is not in the index.')
+        exit(1)
+
+def print_locale_report(resource: str, language: str, keys: dict):
+    status = SUCCESS if not keys['missing'] else FAILURE
+    print(f'{status} {resource} locales/{language}.json: {len(keys["missing"])} missing, {len(keys["unused"])} unused')
+    for key in keys['missing']:
+        print(f'    missing  {key}')
+    for key in keys['unused']:
+        print(f'    unused   {key}')
+
 if __name__ == '__main__':
+    if args.query is not None:
+        query_index()
+        exit(0)
+
+    # -- with records going to stdout, everything else the tool prints goes to stderr
+    records_out = None
+    if args.output == '-':
+        records_out, sys.stdout = sys.stdout, sys.stderr
+        records_out.reconfigure(encoding='utf-8', newline='\n')
+    elif args.output:
+        records_out = open(args.output, 'w', encoding='utf-8', newline='\n')
+
     validate_args()
     if args.path.endswith('\\'):
         args.path = args.path[:-1]
-    resource = Resource(args.path)
-    print(resource.manifest)
 
-    resource.export()
+    cache_dir = None if args.no_cache else args.cache_dir
+
+    cache = ParseCache(cache_dir) if cache_dir else None
+    renderer = TemplateRenderer(args.templates)
+    index = SymbolIndex(args.index) if args.index and not args.batch else None
+
+    if args.serve:
+        # -- only imported here, the server pulls in socketserver / http.server which a plain build never needs
+        from lib.DocServer import DocServer, DEFAULT_ADDRESS
+        if args.index and index is None:
+            index = SymbolIndex(args.index)
+        DocServer(find_resources(args.path), cache, renderer, index, language=args.language).serve(DEFAULT_ADDRESS if args.serve is True else args.serve)
+        if index:
+            index.close()
+        exit(0)
+
+    # -- `@resource/file` imports resolve against the resources of the server the path belongs to. The
+    # -- walk only happens once a manifest has an import; --batch builds its own resolver in each worker
+    imports = None
+    if not args.batch:
+        imports = ImportResolver(import_candidates(args.path), cache)
+    elif args.watch:
+        imports = ImportResolver(discover(args.path), cache)
+
+    if args.profile is not None or args.trace_json:
+        PROFILER.enable()
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler:
+        profiler.enable()
+
+    status = 0
+    if args.batch:
+        results = run_batch(args.path, args.jobs, args.summary, cache_dir=cache_dir, template_dir=args.templates, profile=PROFILER.enabled,
+                            index_path=args.index, sections=args.only, sides=args.side, output_format=args.format, records_out=records_out,
+                            language=args.language, locale_report=args.locales, archive_path=args.archive)
+        if args.locales:
+            for result in results:
+                for language, keys in result.get('locales', {}).items():
+                    print_locale_report(result['resource'], language, keys)
+        status = 1 if any(not r['ok'] for r in results) else 0
+    else:
+        resource = Resource(args.path, cache, renderer, index, sections=args.only, sides=args.side, language=args.language, imports=imports,
+                            call_sites=args.locales)
+        print(resource.manifest)
+        if index:
+            print(f'Symbol index {args.index}: {index.update_resource(resource)} file(s) updated')
+
+        if records_out is not None:
+            stream = RecordStream(records_out.write, args.format)
+            print(f'{resource.export_records(stream)} records written to {args.output}')
+            stream.close()
+        elif args.archive:
+            with ArchiveWriter(args.archive) as archive:
+                resource.export(output_format=args.format, writer=archive.collector(resource.manifest.resource))
+            print(f'{archive.entries} page(s) written to {args.archive}')
+        else:
+            written = resource.export(output_format=args.format)
+            print(f"{written['written']} written, {written['unchanged']} unchanged, {written['removed']} removed")
+        if args.locales:
+            report = resource.locale_report()
+            if not report:
+                print(f'{FAILURE} no locales/*.json found.')
+            for language, keys in report.items():
+                print_locale_report(resource.manifest.resource, language, keys)
+        if cache:
+            cache.prune()
+
+    if records_out is not None and args.output != '-':
+        records_out.close()
+
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+        print(f'cProfile stats written to {args.cprofile}' + (' (main process only)' if args.batch and args.jobs != 1 else ''))
+    if args.profile is not None:
+        print(PROFILER.report(args.profile))
+    if args.trace_json:
+        PROFILER.write_trace(args.trace_json)
+        print(f'Trace written to {args.trace_json}')
 
+    if args.watch:
+        paths = find_resources(args.path) if args.batch else [args.path]
+        if args.index and index is None:
+            index = SymbolIndex(args.index)
+        Watcher(paths, cache, args.interval, renderer, index, sections=args.only, sides=args.side, output_format=args.format,
+                language=args.language, imports=imports).run()
+    if index:
+        index.close()
 
+    exit(status)
@@ -0,0 +1,277 @@
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import contextlib
+import multiprocessing
+import tempfile
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.ManifestReader import Manifest
+from lib.ResourceAnalyzer import Resource, Script
+from lib.BatchRunner import run_batch
+from benchmarks.SyntheticResources import generate_server, generate_adversarial
+
+SUCCESS = '\u2705'  # Check mark
+FAILURE = '\u274C'  # Cross mark
+RESULTS_VERSION = 1
+
+
+def _time(fn, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return {'min': min(runs), 'median': statistics.median(runs), 'runs': len(runs)}
+
+
+def _extract(script_path: str, resource_name: str, kinds: tuple[str, ...] = None) -> Script:
+    """Script extraction is lazy, touch a result so the file really gets parsed."""
+    script = Script(script_path, resource_name, kinds=kinds)
+    getattr(script, script.kinds[0])
+    return script
+
+
+def bench_resources(resource_paths: list[str], export_root: str, repeat: int) -> dict:
+    """Time Manifest, Script extraction and Resource.export separately over every resource."""
+    manifests = [Manifest(path) for path in resource_paths]
+    script_paths = [
+        (os.path.join(m.resource_path, *relative.split('/')), m.resource)
+        for m in manifests
+        for relative in m.shared_scripts + m.client_scripts + m.server_scripts
+    ]
+    script_bytes = sum(os.path.getsize(path) for path, _ in script_paths)
+    resources = [Resource(path) for path in resource_paths]
+    symbols = sum(len(s.events) + len(s.callbacks) + len(s.exports) for r in resources for s in r.scripts())
+
+    def export_all():
+        # -- a fresh folder each time so every page is really written
+        shutil.rmtree(export_root, ignore_errors=True)
+        for resource in resources:
+            resource.export(os.path.join(export_root, resource.manifest.resource))
+
+    results = {
+        'manifest': _time(lambda: [Manifest(path) for path in resource_paths], repeat),
+        'script': _time(lambda: [_extract(path, name) for path, name in script_paths], repeat),
+        'script[exports]': _time(lambda: [_extract(path, name, ('exports',)) for path, name in script_paths], repeat),
+        'export': _time(export_all, repeat),
+    }
+    results['manifest']['items'] = len(resource_paths)
+    results['script'].update(items=len(script_paths), bytes=script_bytes)
+    results['script[exports]'].update(items=len(script_paths), bytes=script_bytes)
+    results['export']['items'] = symbols
+    return results
+
+
+def bench_serve(resource_paths: list[str], repeat: int) -> dict:
+    """A symbols query for every resource, answered by a fresh server (cold parse) and by one already warm."""
+    from lib.DocServer import DocServer
+    names = [os.path.basename(path) for path in resource_paths]
+
+    def query_all(server):
+        for name in names:
+            if not server.handle({'op': 'symbols', 'resource': name})['ok']:
+                raise RuntimeError(f'serve query for {name} failed')
+
+    warm = DocServer(resource_paths)
+    query_all(warm)
+    results = {
+        'serve/cold': _time(lambda: query_all(DocServer(resource_paths)), repeat),
+        'serve/warm': _time(lambda: query_all(warm), repeat),
+    }
+    results['serve/cold']['items'] = results['serve/warm']['items'] = len(names)
+    return results
+
+
+def bench_memory(resource_paths: list[str]) -> dict:
+    """
+    Bytes a fully extracted model of every resource keeps alive, measured
+    with tracemalloc: manifests, file indexes and every symbol record.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        resources = [Resource(path) for path in resource_paths]
+        records = sum(len(getattr(script, kind)) for resource in resources for script in resource.scripts() for kind in Script.KINDS)
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return {'bytes': held, 'records': records, 'bytes_per_record': round(held / records, 1) if records else None}
+
+
+def _peak_rss_child(root: str, work_dir: str, queue):
+    try:
+        import resource
+    except ImportError:  # -- not on Windows
+        queue.put(None)
+        return
+    os.chdir(work_dir)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        run_batch(root, 1, os.path.join(work_dir, 'summary.json'))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put(peak if sys.platform == 'darwin' else peak * 1024)  # -- macOS reports bytes, Linux KiB
+
+
+def bench_rss(work_dir: str, args) -> dict:
+    """
+    Peak RSS of a whole-server batch run over --resources and over
+    --rss-scale times as many, each in a fresh process. A pipeline that
+    releases every resource once it's written keeps the two close.
+    """
+    context = multiprocessing.get_context('spawn')
+    counts = [args.resources, args.resources * args.rss_scale]
+    peaks = []
+    for count in counts:
+        root = os.path.join(work_dir, f'rss-{count}')
+        generate_server(os.path.join(root, 'resources'), count, args.scripts, args.symbols, args.annotation_density, args.glob_heavy, args.seed)
+        queue = context.Queue()
+        child = context.Process(target=_peak_rss_child, args=(os.path.join(root, 'resources'), root, queue))
+        child.start()
+        peaks.append(queue.get())
+        child.join()
+        shutil.rmtree(root, ignore_errors=True)
+    if None in peaks:
+        return None
+    return {'resources': counts, 'peak_bytes': peaks, 'growth': round(peaks[1] / peaks[0] - 1, 4)}
+
+
+def bench_adversarial(paths: dict[str, str], repeat: int) -> dict:
+    results = {}
+    for name, resource_path in paths.items():
+        script_path = os.path.join(resource_path, 'server.lua')
+        results[name] = _time(lambda: _extract(script_path, name), repeat)
+        results[name]['bytes'] = os.path.getsize(script_path)
+    return results
+
+
+def run(args) -> dict:
+    work_dir = tempfile.mkdtemp(prefix='qbox-doc-bench-')
+    try:
+        resource_paths = generate_server(
+            os.path.join(work_dir, 'resources'), args.resources, args.scripts, args.symbols,
+            args.annotation_density, args.glob_heavy, args.seed,
+        )
+        results = bench_resources(resource_paths, os.path.join(work_dir, 'export'), args.repeat)
+        results.update(bench_serve(resource_paths, args.repeat))
+        memory = bench_memory(resource_paths)
+        rss = None if args.no_rss else bench_rss(work_dir, args)
+        if not args.no_adversarial:
+            adversarial = generate_adversarial(os.path.join(work_dir, 'adversarial'), args.adversarial_scale)
+            for name, timing in bench_adversarial(adversarial, args.repeat).items():
+                results[f'adversarial/{name}'] = timing
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'version': RESULTS_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'resources': args.resources,
+            'scripts': args.scripts,
+            'symbols': args.symbols,
+            'annotation_density': args.annotation_density,
+            'glob_heavy': args.glob_heavy,
+            'adversarial_scale': None if args.no_adversarial else args.adversarial_scale,
+            'rss_scale': None if args.no_rss else args.rss_scale,
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': results,
+        'memory': memory,
+        'rss': rss,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Phases that got slower than *baseline* by more than *threshold* (0.2 = 20%)."""
+    if current['config'] != baseline.get('config'):
+        print(f'{FAILURE} baseline was recorded with a different config, timings may not be comparable')
+
+    regressions = []
+    print(f'{"phase":<32}{"baseline":>12}{"current":>12}{"change":>10}')
+    for phase, timing in current['results'].items():
+        before = baseline.get('results', {}).get(phase)
+        if not before:
+            print(f'{phase:<32}{"-":>12}{timing["min"]:>12.4f}{"new":>10}')
+            continue
+        change = timing['min'] / before['min'] - 1 if before['min'] else 0.0
+        flag = FAILURE if change > threshold else SUCCESS
+        print(f'{phase:<32}{before["min"]:>12.4f}{timing["min"]:>12.4f}{change:>+9.0%} {flag}')
+        if change > threshold:
+            regressions.append(phase)
+
+    before = baseline.get('memory')
+    if before and before.get('bytes'):
+        change = current['memory']['bytes'] / before['bytes'] - 1
+        flag = FAILURE if change > threshold else SUCCESS
+        print(f'{"memory (MiB)":<32}{before["bytes"] / 2**20:>12.2f}{current["memory"]["bytes"] / 2**20:>12.2f}{change:>+9.0%} {flag}')
+        if change > threshold:
+            regressions.append('memory')
+
+    # -- judged on its own: peak memory shouldn't follow the number of resources
+    rss = current.get('rss')
+    if rss:
+        flag = FAILURE if rss['growth'] > threshold else SUCCESS
+        print(f'{"peak RSS growth":<32}{"-":>12}{rss["growth"]:>+12.0%}{"":>10} {flag}')
+        if rss['growth'] > threshold:
+            regressions.append('rss')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark manifest parsing, script extraction and export on synthetic resources.')
+    parser.add_argument('--resources', type=int, default=50, help='Number of synthetic resources (default: 50)')
+    parser.add_argument('--scripts', type=int, default=6, help='Scripts per resource (default: 6)')
+    parser.add_argument('--symbols', type=int, default=20, help='Events/callbacks/exports per script (default: 20)')
+    parser.add_argument('--annotation-density', type=float, default=0.7, help='Share of symbols with ---@ annotations (default: 0.7)')
+    parser.add_argument('--glob-heavy', action='store_true', help='List scripts through many overlapping globs')
+    parser.add_argument('--adversarial-scale', type=int, default=1, help='Size multiplier for the adversarial inputs (default: 1)')
+    parser.add_argument('--no-adversarial', action='store_true', help='Skip the adversarial inputs')
+    parser.add_argument('--rss-scale', type=int, default=4, help='Also measure peak RSS of a batch run over this many times --resources (default: 4)')
+    parser.add_argument('--no-rss', action='store_true', help='Skip the peak RSS runs')
+    parser.add_argument('--seed', type=int, default=0, help='Generator seed (default: 0)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per phase, the fastest counts (default: 3)')
+    parser.add_argument('--output', type=str, default='bench_results.json', help='Where to write results (default: bench_results.json)')
+    parser.add_argument('--baseline', type=str, default=None, help='Results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Slowdown that counts as a regression (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    with open(args.output, 'w', encoding='utf-8') as fh:
+        json.dump(results, fh, indent=2)
+    print(f'Results written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'{FAILURE} regressions: {", ".join(regressions)}')
+            return 1
+        print(f'{SUCCESS} no regressions')
+    else:
+        for phase, timing in results['results'].items():
+            print(f'{phase:<32}{timing["min"]:>10.4f}s')
+        memory = results['memory']
+        print(f'{"memory":<32}{memory["bytes"] / 2**20:>10.2f} MiB, {memory["bytes_per_record"]} bytes per record')
+        rss = results['rss']
+        if rss:
+            low, high = rss['peak_bytes']
+            print(f'{"peak RSS":<32}{low / 2**20:>10.2f} MiB for {rss["resources"][0]} resources, '
+                  f'{high / 2**20:.2f} MiB for {rss["resources"][1]} ({rss["growth"]:+.0%})')
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,146 @@
+import os
+import random
+
+# -- shapes of code the generator sprinkles between symbols, so the lexer sees realistic noise
+FILLER = [
+    'local {var} = {{ x = 1, y = "two", z = {{ 3, 4 }} }}',
+    '-- just a comment about {var}',
+    'if {var} then print("{var}", ...) end',
+    'local {var} = [[long string with RegisterNetEvent("fake", function() end)]]',
+    'for i = 1, #{var} do {var}[i] = i * 2 end',
+]
+
+
+def _annotations(rng: random.Random, args: list[str], density: float, returns: bool = False) -> list[str]:
+    if rng.random() >= density:
+        return []
+    lines = ['--- Generated documentation line']
+    lines += [f'---@param {arg} {rng.choice(["number", "string", "table", "boolean"])}' for arg in args]
+    if returns:
+        lines.append(f'---@return {rng.choice(["number", "string", "table?"])}')
+    return lines
+
+
+def _filler(rng: random.Random, count: int) -> list[str]:
+    return [rng.choice(FILLER).format(var=f'v{rng.randrange(1000)}') for _ in range(count)]
+
+
+def generate_script(rng: random.Random, resource: str, side: str, index: int, symbols: int, density: float) -> str:
+    lines = [f'local {resource}_{side}_{index} = {{}}', '']
+    for n in range(symbols):
+        args = [f'arg{i}' for i in range(rng.randrange(4))]
+        kind = n % 3
+        lines += _filler(rng, rng.randrange(1, 4))
+        if kind == 0:
+            lines += _annotations(rng, args, density)
+            lines.append(f"RegisterNetEvent('{resource}:{side}:event{index}_{n}', function({', '.join(args)})")
+            lines += ['    ' + line for line in _filler(rng, 2)]
+            lines.append('end)')
+        elif kind == 1:
+            lines += _annotations(rng, ['source'] + args, density)
+            lines.append(f"lib.callback.register('{resource}:{side}:cb{index}_{n}', function({', '.join(['source'] + args)})")
+            lines.append('    return true')
+            lines.append('end)')
+        else:
+            lines += _annotations(rng, args, density, returns=True)
+            style = rng.randrange(3)
+            if style == 0:
+                lines.append(f'local function fn{index}_{n}({", ".join(args)})')
+            elif style == 1:
+                lines.append(f'local fn{index}_{n} = function({", ".join(args)})')
+            else:
+                lines.append(f'function fn{index}_{n}({", ".join(args)})')
+            lines += ['    return nil', 'end', f"exports('Export{index}_{n}', fn{index}_{n})"]
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def generate_resource(root: str, name: str, rng: random.Random, scripts: int, symbols: int, density: float, glob_heavy: bool) -> str:
+    resource_path = os.path.join(root, name)
+    manifest = ['fx_version "cerulean"', "game 'gta5'", f"description 'Synthetic resource {name}'", '']
+    sides = {'client': [], 'server': [], 'shared': []}
+
+    for index in range(scripts):
+        side = ('client', 'server', 'shared')[index % 3]
+        folder = f'{side}/module{index % 4}' if glob_heavy else side
+        relative = f'{folder}/script{index}.lua'
+        os.makedirs(os.path.join(resource_path, *folder.split('/')), exist_ok=True)
+        with open(os.path.join(resource_path, *relative.split('/')), 'w', encoding='utf-8') as fh:
+            fh.write(generate_script(rng, name, side, index, symbols, density))
+        sides[side].append(relative)
+
+    for side, files in sides.items():
+        if glob_heavy:
+            entries = [f'{side}/**/*.lua'] + [f'{side}/module{i}/*.lua' for i in range(4)] + [f'{side}/*/script*.lua']
+        else:
+            entries = files
+        manifest.append(f'{side}_scripts {{')
+        if side == 'shared':
+            manifest.append("    '@ox_lib/init.lua',")
+        manifest += [f"    '{entry}'," for entry in entries]
+        manifest += ['}', '']
+
+    with open(os.path.join(resource_path, 'fxmanifest.lua'), 'w', encoding='utf-8') as fh:
+        fh.write('\n'.join(manifest))
+    return resource_path
+
+
+def generate_server(root: str, resources: int = 50, scripts: int = 6, symbols: int = 20,
+                    annotation_density: float = 0.7, glob_heavy: bool = False, seed: int = 0) -> list[str]:
+    """
+    Write *resources* synthetic resources under *root*, spread over a few
+    `[category]` folders like a real server. Same arguments, same bytes.
+    """
+    rng = random.Random(seed)
+    paths = []
+    for n in range(resources):
+        category = os.path.join(root, f'[category{n % 5}]')
+        paths.append(generate_resource(category, f'synthetic_{n}', rng, scripts, symbols, annotation_density, glob_heavy))
+    return paths
+
+
+def generate_adversarial(root: str, scale: int = 1) -> dict[str, str]:
+    """
+    Resources built to hurt a parser: name -> resource path. Each one is a
+    single server script so it can be timed on its own.
+    """
+    cases = {
+        # -- thousands of annotation lines in front of one registration
+        'long_param_block': '\n'.join(
+            [f'---@param p{i} number' for i in range(20000 * scale)]
+            + ["RegisterNetEvent('adv:long', function(a) end)"]
+        ),
+        # -- a multi-megabyte bundle on one line
+        'minified': ' '.join(
+            f"RegisterNetEvent('adv:min{i}',function(a,b)local x={{1,2,{{3}}}}end) "
+            f"local function f{i}(a)return a end exports('E{i}',f{i})"
+            for i in range(20000 * scale)
+        ),
+        # -- unbalanced quotes and brackets everywhere
+        'unterminated': '\n'.join(
+            ["local s = 'never closed", 'local t = {{{{', 'exports("x", ', '--[[ not closed either'][i % 4]
+            for i in range(50000 * scale)
+        ),
+        # -- deep nesting of tables and parens, inside calls the scanner has to read (a file without
+        # -- a trigger word is skipped before it is lexed)
+        'nesting': "lib.addCommand('nested', { params = " + '{' * (5000 * scale) + '}' * (5000 * scale) + ' }, function() end)\n'
+                   + "exports('nested', " + 'x(' * (5000 * scale) + ')' * (5000 * scale) + ')',
+        # -- commands with brace-heavy strings, one nested thousands deep, then a run of tables that never close
+        'commands': '\n'.join(
+            [f"lib.addCommand('cmd{i}', {{ help = 'Help {i}, {{ not a table }}', params = {{ {{ name = 'target', type = 'playerId', "
+             f"help = 'who', optional = true }} }}, restricted = 'group.admin' }}, function(source, args) end)" for i in range(5000 * scale)]
+            + ["lib.addCommand('deep', { params = " + '{' * (5000 * scale) + '}' * (5000 * scale) + ' }, function() end)']
+            + ["lib.addCommand('broken', { help = 'never closed', params = {"] * (5000 * scale)
+        ),
+    }
+
+    paths = {}
+    for name, source in cases.items():
+        resource_path = os.path.join(root, f'adversarial_{name}')
+        os.makedirs(resource_path, exist_ok=True)
+        with open(os.path.join(resource_path, 'fxmanifest.lua'), 'w', encoding='utf-8') as fh:
+            fh.write("fx_version 'cerulean'\nserver_script 'server.lua'\n")
+        with open(os.path.join(resource_path, 'server.lua'), 'w', encoding='utf-8') as fh:
+            fh.write(source)
+        paths[name] = resource_path
+    return paths
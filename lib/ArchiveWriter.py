@@ -0,0 +1,151 @@
+import os
+import io
+import time
+import gzip
+import tarfile
+import zipfile
+import tempfile
+from lib.Profiler import PROFILER
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz')
+# -- 1980-01-01, the earliest time a zip entry can hold
+DEFAULT_EPOCH = 315532800
+
+
+def archive_epoch() -> int:
+    """Timestamp every entry gets: SOURCE_DATE_EPOCH when set, as reproducible builds expect."""
+    try:
+        return max(int(os.environ['SOURCE_DATE_EPOCH']), DEFAULT_EPOCH)
+    except (KeyError, ValueError):
+        return DEFAULT_EPOCH
+
+
+class ArchiveWriter:
+    """
+    One .zip / .tar / .tar.gz file that every docs page is streamed into,
+    instead of a file per page. Entries get a fixed timestamp, owner and
+    mode and go in in the order they're added, so the same docs always give
+    a byte-identical archive. It's written next to *path* and only moved
+    into place by close().
+    """
+    def __init__(self, path: str, epoch: int = None):
+        if not path.endswith(ARCHIVE_SUFFIXES):
+            raise ValueError(f'Unknown archive type {path!r}, use one of {", ".join(ARCHIVE_SUFFIXES)}')
+        self.path = path
+        self.epoch = archive_epoch() if epoch is None else epoch
+        self._date_time = time.gmtime(self.epoch)[:6]
+        self.entries = 0
+        self.bytes_written = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+        self._raw = os.fdopen(fd, 'wb')
+        self._gzip = None
+        if path.endswith('.zip'):
+            self._zip = zipfile.ZipFile(self._raw, 'w', zipfile.ZIP_DEFLATED)
+            self._tar = None
+        else:
+            fileobj = self._raw
+            if path.endswith(('.tar.gz', '.tgz')):
+                # -- gzip stamps its header with the time and file name unless told otherwise
+                fileobj = self._gzip = gzip.GzipFile(filename='', mode='wb', fileobj=self._raw, mtime=0)
+            self._tar = tarfile.open(fileobj=fileobj, mode='w', format=tarfile.PAX_FORMAT)
+            self._zip = None
+
+    def __repr__(self):
+        return f"ArchiveWriter(path={self.path}, entries={self.entries})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def add(self, name: str, data: bytes):
+        """Append one file, *name* with forward slashes."""
+        with PROFILER.span('archive.add', 'write', page=name):
+            if self._zip is not None:
+                info = zipfile.ZipInfo(name, date_time=self._date_time)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.create_system = 3  # -- unix, whatever the platform, so the mode below is kept
+                info.external_attr = 0o644 << 16
+                self._zip.writestr(info, data)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = self.epoch
+                info.mode = 0o644
+                self._tar.addfile(info, io.BytesIO(data))
+        self.entries += 1
+        self.bytes_written += len(data)
+
+    def collector(self, prefix: str) -> 'PageCollector':
+        """A writer for Resource.export() whose pages land under *prefix*/ in this archive."""
+        return PageCollector(lambda relative_path, data: self.add(f'{prefix}/{relative_path}', data))
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+        else:
+            self._tar.close()
+            if self._gzip is not None:
+                self._gzip.close()
+        self._raw.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._raw.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class PageCollector:
+    """
+    OutputWriter stand-in that keeps every page in memory and hands it to
+    *sink(relative_path, data)* once it's complete, nothing touches the disk.
+    """
+    def __init__(self, sink):
+        self.sink = sink
+        self.written = 0
+        self.bytes_written = 0
+
+    def __repr__(self):
+        return f"PageCollector(written={self.written})"
+
+    def stats(self) -> dict:
+        return {'written': self.written, 'unchanged': 0, 'removed': 0, 'bytes_written': self.bytes_written}
+
+    def open(self, relative_path: str) -> '_CollectedPage':
+        return _CollectedPage(self, relative_path)
+
+    def write(self, relative_path: str, content: str):
+        with self.open(relative_path) as page:
+            page.write(content)
+
+    def discard(self, relative_path: str):
+        pass
+
+    def finish(self) -> dict:
+        return self.stats()
+
+
+class _CollectedPage:
+    def __init__(self, collector: PageCollector, relative_path: str):
+        self.collector = collector
+        self.relative_path = relative_path
+        self._parts = []
+        self.write = self._parts.append
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            data = ''.join(self._parts).encode('utf-8')
+            self.collector.sink(self.relative_path, data)
+            self.collector.written += 1
+            self.collector.bytes_written += len(data)
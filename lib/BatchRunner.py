@@ -0,0 +1,271 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import traceback
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from lib.ResourceAnalyzer import Resource
+from lib.ParseCache import ParseCache
+from lib.SymbolIndex import SymbolIndex
+from lib.JsonExport import RecordStream, SUFFIXES, merge
+from lib.TemplateRenderer import TemplateRenderer
+from lib.Imports import ImportResolver
+from lib.ArchiveWriter import ArchiveWriter, PageCollector
+from lib.Pipeline import bounded, ordered_map
+from lib.Profiler import PROFILER
+
+SUCCESS = '\u2705'  # Check mark
+FAILURE = '\u274C'  # Cross mark
+SKIP_DIRS = {'.git', 'node_modules', 'stream', 'web', 'html'}
+
+
+def discover(root: str, max_depth: int = None):
+    """
+    Every folder under *root* holding an fxmanifest.lua, one at a time as the
+    walk finds them. `[category]` folders are walked into, resource folders
+    are not, same as the server does. With *max_depth* the walk stops that
+    many folders below *root*.
+    """
+    base_depth = root.rstrip(os.sep).count(os.sep)
+    for directory, subdirs, files in os.walk(root):
+        if 'fxmanifest.lua' in files:
+            yield directory
+            subdirs[:] = []
+            continue
+        if max_depth is not None and directory.rstrip(os.sep).count(os.sep) - base_depth >= max_depth:
+            subdirs[:] = []
+            continue
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith('.') and d not in SKIP_DIRS)
+
+
+def find_resources(root: str) -> list[str]:
+    """discover() as a sorted list."""
+    return sorted(discover(root))
+
+
+def server_root(resource_path: str) -> str:
+    """The nearest `resources` folder above a resource, None when it isn't inside one."""
+    path = os.path.abspath(resource_path)
+    parent = os.path.dirname(path)
+    while parent != path:
+        if os.path.basename(parent) == 'resources':
+            return parent
+        path, parent = parent, os.path.dirname(parent)
+    return None
+
+
+def import_candidates(resource_path: str):
+    """
+    The resources `@resource/file` imports of a lone resource may point at,
+    lazily: everything under its server's `resources` folder, or outside of
+    one only its siblings, never an arbitrary parent tree.
+    """
+    root = server_root(resource_path)
+    if root is not None:
+        return discover(root)
+    return discover(os.path.dirname(os.path.abspath(resource_path)), max_depth=1)
+
+
+def index_resource(resource_path: str, cache_dir: str, index_path: str) -> tuple[str, int, str]:
+    """Parse one resource into the symbol index: (resource, files updated, error). Never raises."""
+    cache = ParseCache(cache_dir) if cache_dir else None
+    try:
+        with SymbolIndex(index_path) as index:
+            return resource_path, index.update_resource(Resource(resource_path, cache, call_sites=True)), None
+    except Exception as e:
+        return resource_path, 0, f'{type(e).__name__}: {e}'
+
+
+def build_resource(resource_path: str, *, cache_dir: str = None, template_dir: str = None, profile: bool = False, index_path: str = None,
+                   sections: tuple[str, ...] = None, sides: tuple[str, ...] = None, output_format: str = 'mdx',
+                   language: str = None, locale_report: bool = False, root: str = None, collect_pages: bool = False,
+                   records_dir: str = None) -> dict:
+    """
+    Parse and export a single resource. Runs inside a worker process, so
+    never raises. With *collect_pages* nothing is written, the rendered
+    pages come back as result['pages'] instead, (relative path, bytes) each.
+    """
+    if profile:
+        PROFILER.enable()
+    first_event, counters_before = len(PROFILER.events), PROFILER.counters.copy()
+    started = time.perf_counter()
+    result = {'path': resource_path, 'resource': os.path.basename(resource_path), 'ok': False}
+    cache = ParseCache(cache_dir) if cache_dir else None
+    index = SymbolIndex(index_path) if index_path else None
+    try:
+        imports = _import_resolver(resource_path, root, cache)
+        resource = Resource(resource_path, cache, _renderer(template_dir), index, sections=sections, sides=sides, language=language,
+                            imports=imports, call_sites=locale_report)
+        pages = []
+        writer = PageCollector(lambda relative_path, data: pages.append((relative_path, data))) if collect_pages else None
+        # -- symbols files only there to be merged go to a scratch folder, not into export/
+        export_directory = tempfile.mkdtemp(prefix=f'{resource.manifest.resource}-', dir=records_dir) if records_dir else None
+        written = resource.export(export_directory, output_format=output_format, writer=writer)
+        if collect_pages:
+            result['pages'] = pages
+        elif output_format != 'mdx':
+            result['output'] = os.path.join(export_directory or resource.export_directory, f'symbols{SUFFIXES[output_format]}')
+        result.update(
+            ok=True,
+            **written,
+            **{section: sum(len(getattr(s, section)) for s in resource.scripts()) for section in resource.sections},
+            missing_scripts=[s.script_path for s in resource.scripts() if not s.exists],
+        )
+        if locale_report and resource.locales.languages:
+            result['locales'] = resource.locale_report()
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+        result['traceback'] = traceback.format_exc()
+    if index:
+        index.close()
+    if cache:
+        result.update(cache_hits=cache.hits, cache_misses=cache.misses)
+    result['seconds'] = round(time.perf_counter() - started, 4)
+    if profile:
+        result['profile'] = {'events': PROFILER.events[first_event:], 'counters': PROFILER.counters - counters_before}
+    return result
+
+
+def run_batch(root: str, jobs: int = None, summary_path: str = None, *, cache_dir: str = None, template_dir: str = None,
+              profile: bool = False, index_path: str = None, sections: tuple[str, ...] = None, sides: tuple[str, ...] = None,
+              output_format: str = 'mdx', records_out=None, language: str = None, locale_report: bool = False,
+              archive_path: str = None) -> list[dict]:
+    """
+    Build every resource under *root* over a pool of *jobs* worker processes
+    (all cores by default) and write one combined JSON summary. Workers share
+    the parse cache in *cache_dir*, if given. With *index_path* every resource
+    goes into the symbol index first, so each page can list its users from
+    the whole server. *sections* / *sides* limit what gets built, see Resource.
+    With a json/ndjson *output_format* each resource gets a symbols file, and
+    given a text stream *records_out* they're all merged into it afterwards
+    (and only there, the per-resource files are scratch).
+    *language* picks the locale help texts are rendered in, and with
+    *locale_report* each result lists the missing / unused locale keys.
+    `@resource/file` imports resolve against the resources under *root*, each
+    worker parses an imported file once however many resources load it.
+    With *archive_path* every page goes into that one zip / tar.gz instead.
+
+    Resources stream through: discovery runs ahead of the builds, at most
+    2 x *jobs* resources are in flight and each one's model is gone once its
+    pages are written, so memory doesn't grow with the size of the server.
+    Results come back in discovery order, which keeps the archive stable.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    print(f'Building every resource under {root}, using {jobs} worker(s)')
+
+    if index_path:
+        # -- every resource has to be indexed before the first page can list its users
+        resource_paths = find_resources(root)
+        _index_all(resource_paths, jobs, cache_dir, index_path)
+    else:
+        resource_paths = bounded(discover(root))
+
+    archive = ArchiveWriter(archive_path) if archive_path else None
+    records_dir = tempfile.mkdtemp(prefix='qbox-doc-records-') if records_out is not None else None
+    build = partial(build_resource, cache_dir=cache_dir, template_dir=template_dir, profile=profile, index_path=index_path,
+                    sections=sections, sides=sides, output_format=output_format, language=language, locale_report=locale_report,
+                    root=root, collect_pages=archive_path is not None, records_dir=records_dir)
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=_worker_init, initargs=(sys.stdout is sys.stderr,)) if jobs > 1 else None
+    results, names = [], {}
+    try:
+        # -- with one job the builds run right here (where --cprofile sees them), only discovery has its own thread
+        built = ordered_map(pool, build, resource_paths, 2 * jobs) if pool else map(build, resource_paths)
+        for result in built:
+            profiled = result.pop('profile', None)
+            if pool and profiled:
+                PROFILER.merge(profiled['events'], profiled['counters'])  # -- in process it went straight into PROFILER
+            name = result['resource']
+            if name in names:
+                print(f'{FAILURE} duplicate resource name {name}: {names[name]}, {result["path"]}')
+            names.setdefault(name, result['path'])
+            for relative_path, data in result.pop('pages', ()):
+                archive.add(f'{name}/{relative_path}', data)
+            results.append(_report(result))
+    except BaseException:
+        if archive:
+            archive.abort()
+        if records_dir:
+            shutil.rmtree(records_dir, ignore_errors=True)
+        raise
+    finally:
+        if pool:
+            pool.shutdown()
+
+    results.sort(key=lambda r: r['path'])
+    if archive:
+        archive.close()
+        print(f'{archive.entries} page(s) written to {archive_path}')
+    if cache_dir:
+        ParseCache(cache_dir).prune()
+    if records_out is not None:
+        stream = RecordStream(records_out.write, output_format)
+        merge((r['output'] for r in results if r['ok']), stream)
+        stream.close()
+        shutil.rmtree(records_dir, ignore_errors=True)
+
+    summary = {
+        'root': root,
+        'jobs': jobs,
+        'resources': len(results),
+        'failed': sum(1 for r in results if not r['ok']),
+        'results': results,
+    }
+    summary_path = summary_path or os.path.join(os.getcwd(), 'export', 'summary.json')
+    os.makedirs(os.path.dirname(summary_path) or '.', exist_ok=True)
+    with open(summary_path, 'w', encoding='utf-8') as fh:
+        json.dump(summary, fh, indent=2)
+
+    print(f'{summary["resources"] - summary["failed"]}/{summary["resources"]} resources built, summary written to {summary_path}')
+    return results
+
+
+def _index_all(resource_paths: list[str], jobs: int, cache_dir: str, index_path: str):
+    started = time.perf_counter()
+    with SymbolIndex(index_path) as index:  # -- schema is set up once, before any worker opens it
+        dropped = index.retain_resources(os.path.basename(path) for path in resource_paths)
+    if jobs == 1:
+        indexed = [index_resource(path, cache_dir, index_path) for path in resource_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_worker_init, initargs=(sys.stdout is sys.stderr,)) as pool:
+            indexed = list(pool.map(index_resource, resource_paths, [cache_dir] * len(resource_paths), [index_path] * len(resource_paths)))
+    for path, _, error in indexed:
+        if error:
+            print(f'{FAILURE} unable to index {os.path.basename(path)}: {error}')
+    updated = sum(count for _, count, _ in indexed)
+    print(f'Symbol index {index_path}: {updated} file(s) updated, {dropped} dropped in {time.perf_counter() - started:.2f}s')
+
+
+def _worker_init(stdout_to_stderr: bool):
+    # -- when stdout carries records, spawned workers must keep their chatter off it too
+    if stdout_to_stderr:
+        sys.stdout = sys.stderr
+
+
+_renderers = {}
+_import_resolvers = {}
+
+def _import_resolver(resource_path: str, root: str, cache) -> ImportResolver:
+    """One resolver, and so one set of parsed imports, per worker process and server root."""
+    if root is None:
+        return ImportResolver(import_candidates(resource_path), cache)
+    if root not in _import_resolvers:
+        _import_resolvers[root] = ImportResolver(discover(root), cache)
+    return _import_resolvers[root]
+
+
+def _renderer(template_dir: str) -> TemplateRenderer:
+    """Templates are compiled once per worker process, not once per resource."""
+    if template_dir not in _renderers:
+        _renderers[template_dir] = TemplateRenderer(template_dir)
+    return _renderers[template_dir]
+
+
+def _report(result: dict) -> dict:
+    if result['ok']:
+        print(f'{SUCCESS} {result["resource"]} ({result["seconds"]}s)')
+    else:
+        print(f'{FAILURE} {result["resource"]}: {result["error"]}')
+    return result
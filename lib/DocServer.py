@@ -0,0 +1,228 @@
+import os
+import json
+import stat
+import socket
+import time
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+from lib.Watcher import WatchedResource
+from lib.Imports import ImportResolver
+from lib.JsonExport import KINDS, symbol_record
+
+SUCCESS = '\u2705'  # Check mark
+FAILURE = '\u274C'  # Cross mark
+DEFAULT_ADDRESS = 'http://127.0.0.1:8765'
+
+# -- record kind -> docs section
+SECTIONS = {kind: section for section, kind in KINDS.items()}
+
+
+class RequestError(Exception):
+    pass
+
+
+class DocServer:
+    """
+    Keeps the parsed Manifest/Script models of a set of resources in memory
+    and answers queries about them. A resource is parsed the first time a
+    query needs it; after that every query only stats its files and
+    re-parses what changed, the same way --watch does.
+
+    Requests and responses are JSON objects, one per line:
+
+        {"op": "symbols", "resource": "qbx_core"}
+        {"op": "render", "resource": "qbx_core", "file": "server/main.lua"}
+        {"op": "find", "name": "qbx_core:GetPlayer"}   (kind defaults to export)
+        {"op": "resources"} / {"op": "ping"}
+
+    Every response carries "ok" and either "result" or "error", plus the
+    request's "id" when it had one.
+    """
+    def __init__(self, resource_paths: list[str], cache=None, renderer=None, index=None, *, language: str = None):
+        self.paths = {os.path.basename(path): path for path in resource_paths}
+        self.cache = cache
+        self.renderer = renderer
+        self.index = index
+        self.language = language
+        self.imports = ImportResolver(resource_paths, cache)
+        self._watched = {}
+        # -- models aren't thread safe, requests are answered one at a time
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"DocServer(resources={len(self.paths)}, loaded={len(self._watched)})"
+
+    def resource(self, name: str):
+        """The up to date model of one resource, parsed on first use."""
+        watched = self._watched.get(name)
+        if watched is None:
+            if name not in self.paths:
+                raise RequestError(f'unknown resource {name!r}')
+            watched = self._watched[name] = WatchedResource(self.paths[name], self.cache, self.renderer, self.index, language=self.language,
+                                                                 imports=self.imports)
+        else:
+            changed = watched.changed()
+            if changed:
+                watched.refresh(changed)
+            else:
+                return watched.resource
+        if self.index:
+            self.index.update_resource(watched.resource)
+        return watched.resource
+
+    def _refresh_index(self):
+        # -- "used by" comes from every resource, so all of them have to be parsed and current
+        if self.index:
+            for name in self.paths:
+                self.resource(name)
+
+    def handle(self, request: dict) -> dict:
+        started = time.perf_counter()
+        response = {'id': request['id']} if isinstance(request, dict) and 'id' in request else {}
+        try:
+            if not isinstance(request, dict):
+                raise RequestError('a request is a JSON object')
+            op = getattr(self, f'op_{request.get("op")}', None)
+            if op is None:
+                raise RequestError(f'unknown op {request.get("op")!r}')
+            with self._lock:
+                response.update(ok=True, result=op(request))
+        except RequestError as e:
+            response.update(ok=False, error=str(e))
+        except Exception as e:
+            response.update(ok=False, error=f'{type(e).__name__}: {e}')
+        response['ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return response
+
+    def handle_line(self, line: str) -> str:
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return json.dumps({'ok': False, 'error': f'invalid JSON: {e}'}, ensure_ascii=False)
+        return json.dumps(self.handle(request), ensure_ascii=False)
+
+    def op_ping(self, request):
+        return 'pong'
+
+    def op_resources(self, request):
+        return sorted(self.paths)
+
+    def op_symbols(self, request):
+        resource = self.resource(_field(request, 'resource'))
+        return list(resource.records())
+
+    def op_render(self, request):
+        resource = self.resource(_field(request, 'resource'))
+        relative = _field(request, 'file')
+        self._refresh_index()
+        mdx = resource.render_script(os.path.join(resource.resource_path, *relative.split('/')))
+        if mdx is None:
+            raise RequestError(f'{relative} is not a script of {resource.manifest.resource}')
+        return mdx
+
+    def op_find(self, request):
+        """Every definition of a symbol (and its users, with an index); for exports *name* may be `resource:fn`."""
+        name = _field(request, 'name')
+        kind = request.get('kind', 'export')
+        section = SECTIONS.get(kind)
+        if section is None:
+            raise RequestError(f'kind must be one of {", ".join(SECTIONS)}')
+        names = list(self.paths)
+        if kind == 'export' and ':' in name:
+            resource_name, _, name = name.partition(':')
+            names = [resource_name] if resource_name in self.paths else []
+        self._refresh_index()
+
+        found = []
+        for resource_name in names:
+            resource = self.resource(resource_name)
+            for side in resource.SIDES:
+                for script in resource.side_scripts(side):
+                    relative = os.path.relpath(script.script_path, resource.resource_path).replace(os.sep, '/')
+                    for item in getattr(script, section):
+                        if item.name != name:
+                            continue
+                        record = symbol_record(item, section, resource_name, side, relative)
+                        if self.index:
+                            record['used_by'] = self.index.used_by(section, item, resource_name)
+                        found.append(record)
+        return found
+
+    def serve(self, address: str = DEFAULT_ADDRESS):
+        """Answer requests on a Unix socket (`unix:PATH`) or over HTTP (`http://HOST:PORT`) until interrupted."""
+        unix = address.startswith('unix:')
+        if unix:
+            if not hasattr(socket, 'AF_UNIX'):
+                raise ValueError('Unix sockets aren\'t available on this platform, use http://HOST:PORT')
+            server = _UnixServer(address[len('unix:'):], self)
+        else:
+            parts = urlsplit(address if '//' in address else f'http://{address}')
+            if parts.scheme != 'http':
+                raise ValueError(f'Unsupported address {address!r}, use unix:PATH or http://HOST:PORT')
+            server = ThreadingHTTPServer((parts.hostname or '127.0.0.1', parts.port or 8765), _HTTPHandler)
+            server.docs = self
+
+        print(f'{SUCCESS} serving {len(self.paths)} resource(s) on {address}, press Ctrl+C to stop')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print('Stopped serving')
+        finally:
+            server.server_close()
+            if unix:
+                os.remove(server.server_address)
+
+
+def _field(request: dict, name: str) -> str:
+    value = request.get(name)
+    if not isinstance(value, str) or not value:
+        raise RequestError(f'{request.get("op")} needs a {name!r} string')
+    return value
+
+
+class _UnixHandler(socketserver.StreamRequestHandler):
+    # -- a client may keep the connection open and send one request per line
+    def handle(self):
+        for line in self.rfile:
+            line = line.decode('utf-8').strip()
+            if line:
+                self.wfile.write(self.server.docs.handle_line(line).encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+
+# -- socketserver.UnixStreamServer doesn't exist on Windows
+if hasattr(socket, 'AF_UNIX'):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path: str, docs: DocServer):
+            if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+                os.remove(path)  # -- left behind by a server that didn't shut down cleanly
+            super().__init__(path, _UnixHandler)
+            self.docs = docs
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    """POST a body of request lines to any path, or GET /<op>?name=value&... for a single request."""
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode('utf-8')
+        lines = [self.server.docs.handle_line(line) for line in body.splitlines() if line.strip()]
+        self._reply(''.join(line + '\n' for line in lines))
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        request = dict(parse_qsl(parts.query), op=parts.path.strip('/'))
+        self._reply(json.dumps(self.server.docs.handle(request), ensure_ascii=False) + '\n')
+
+    def _reply(self, body: str):
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,142 @@
+import os
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+SKIP_DIRS = {'.git', 'node_modules'}
+
+# -- a `**` segment: any number of (non-hidden) folders, or everything below when it ends the pattern
+_ANY_DIRS = r'(?:[^/.][^/]*/)*'
+_ANY_FILES = r'[^/.][^/]*(?:/[^/.][^/]*)*'
+
+
+def _translate_segment(segment: str) -> str:
+    out, i = [], 0
+    while i < len(segment):
+        c = segment[i]
+        i += 1
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = segment.find(']', i + 1 if i < len(segment) and segment[i] in '!^' else i)
+            if end == -1:
+                out.append(r'\[')
+                continue
+            body = segment[i:end].replace('\\', r'\\')
+            if body[:1] in ('!', '^'):
+                body = '^' + body[1:]
+            out.append(f'[{body}]')
+            i = end + 1
+        else:
+            out.append(re.escape(c))
+    # -- like glob, wildcards never match a leading dot
+    prefix = '' if segment.startswith('.') else r'(?!\.)'
+    return prefix + ''.join(out)
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """Matcher for a manifest glob against forward-slash paths relative to the resource."""
+    segments = pattern.split('/')
+    parts = []
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+        if segment == '**':
+            parts.append(_ANY_FILES if last else _ANY_DIRS)
+        else:
+            parts.append(_translate_segment(segment) + ('' if last else '/'))
+    return re.compile(''.join(parts) + r'\Z')
+
+
+def normalise(path: str) -> str:
+    """Manifest-style path: forward slashes, no leading './'."""
+    path = path.replace('\\', '/')
+    while path.startswith('./'):
+        path = path[2:]
+    return path
+
+
+class FileIndex:
+    """
+    Every file of a resource, from a single os.scandir walk, as sorted
+    forward-slash paths relative to the resource root. Manifest globs are
+    matched against it and script existence is answered from it, so the
+    disk is walked once per resource however many patterns there are.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.files = []
+        self.directories = []  # -- every folder walked, for cache invalidation
+        self._walk()
+        self._file_set = set(self.files)
+
+    def __repr__(self):
+        return f"FileIndex(root={self.root}, files={len(self.files)})"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_file_set']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._file_set = set(self.files)
+
+    def _walk(self):
+        stack = [('', self.root)]
+        seen = set()
+        while stack:
+            relative, directory = stack.pop()
+            self.directories.append(directory)
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                path = f'{relative}{entry.name}'
+                try:
+                    if entry.is_dir():
+                        if entry.name in SKIP_DIRS:
+                            continue
+                        if entry.is_symlink():
+                            real = os.path.realpath(entry.path)
+                            if real in seen:
+                                continue
+                            seen.add(real)
+                        stack.append((path + '/', entry.path))
+                    else:
+                        self.files.append(path)
+                except OSError:
+                    continue
+        self.files.sort()
+        self.directories.sort()
+
+    def exists(self, relative_path: str) -> bool:
+        return normalise(relative_path) in self._file_set
+
+    def listdir(self, relative_dir: str):
+        """Files directly inside *relative_dir*, or None when it holds no files."""
+        prefix = normalise(relative_dir).rstrip('/') + '/'
+        names = [path[len(prefix):] for path in self._under(prefix) if '/' not in path[len(prefix):]]
+        return names or None
+
+    def _under(self, prefix: str):
+        index = bisect_left(self.files, prefix)
+        while index < len(self.files) and self.files[index].startswith(prefix):
+            yield self.files[index]
+            index += 1
+
+    def match(self, pattern: str) -> list[str]:
+        """Files matching a manifest glob, in sorted order."""
+        pattern = normalise(pattern)
+        matcher = compile_pattern(pattern)
+        # -- only the part of the sorted index under the pattern's static folders can match
+        static = []
+        for segment in pattern.split('/')[:-1]:
+            if any(c in segment for c in '*?['):
+                break
+            static.append(segment)
+        prefix = '/'.join(static) + '/' if static else ''
+        return [path for path in self._under(prefix) if matcher.match(path)]
@@ -0,0 +1,77 @@
+import os
+from lib.FileIndex import normalise
+from lib.ResourceAnalyzer import Script
+from lib.Profiler import PROFILER
+
+
+class ImportResolver:
+    """
+    Resolves `@resource/path` manifest entries against a map of resource
+    name -> folder. Every imported file is parsed at most once, however many
+    resources import it: Scripts are shared by real path and only parsed
+    again when the file's size or mtime moves. A resource listing a file
+    that was imported before gets the shared Script too; its other scripts
+    aren't kept, so memory only grows with the imported files.
+    """
+    def __init__(self, resource_paths, cache=None):
+        # -- any iterable of resource folders (a discover() walk, ...), only gone through on the first resolve()
+        self._resource_paths = resource_paths
+        self._roots = None
+        self.cache = cache
+        self.parsed = 0
+        self._scripts = {}
+
+    def __repr__(self):
+        return f"ImportResolver(scripts={len(self._scripts)}, parsed={self.parsed})"
+
+    @property
+    def roots(self) -> dict[str, str]:
+        """Resource name -> folder."""
+        if self._roots is None:
+            self._roots = {}
+            for path in self._resource_paths:
+                self._roots.setdefault(os.path.basename(os.path.normpath(path)), path)
+            self._resource_paths = None
+        return self._roots
+
+    def resolve(self, import_: str):
+        """(resource name, path) of an `@resource/path` entry, or None when either isn't there."""
+        resource, _, relative = normalise(import_[1:]).partition('/')
+        root = self.roots.get(resource)
+        if root is None or not relative:
+            return None
+        path = os.path.join(root, *relative.split('/'))
+        return (resource, path) if os.path.isfile(path) else None
+
+    def script(self, import_: str):
+        """The shared Script of an import, or None when it doesn't resolve."""
+        resolved = self.resolve(import_)
+        if resolved is None:
+            return None
+        resource, path = resolved
+        return self.shared(path, resource)
+
+    def shared(self, path: str, resource_name: str, parse: bool = True):
+        """
+        The shared Script of the file at *path*. Unless *parse*, only one
+        already shared is handed out. None when there's none or no such file.
+        """
+        real_path = os.path.realpath(path)
+        entry = self._scripts.get(real_path)
+        if entry is None and not parse:
+            return None
+        try:
+            stat = os.stat(real_path)
+        except OSError:
+            return None
+
+        key = (stat.st_size, stat.st_mtime_ns)
+        if entry is None or entry[0] != key:
+            if not parse:
+                return None
+            entry = self._scripts[real_path] = (key, Script(path, resource_name, self.cache, True))
+            self.parsed += 1
+            PROFILER.count('imports.parsed')
+        else:
+            PROFILER.count('imports.shared')
+        return entry[1]
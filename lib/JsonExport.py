@@ -0,0 +1,97 @@
+import json
+from typing import Callable, Iterable
+
+SCHEMA = 'qbox-doc-gen/symbols'
+SCHEMA_VERSION = 2
+FORMATS = ('mdx', 'json', 'ndjson')
+SUFFIXES = {'json': '.json', 'ndjson': '.ndjson'}
+
+# -- docs section -> record kind, also the call-site kind that uses its symbols
+KINDS = {'events': 'event', 'callbacks': 'callback', 'exports': 'export', 'commands': 'command'}
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+
+
+def symbol_record(item, section: str, resource: str, side: str, file: str) -> dict:
+    """One symbol as a plain dict, the same shape for every kind (commands add help, restricted and aliases)."""
+    if section == 'commands':
+        return {
+            'kind': KINDS[section],
+            'resource': resource,
+            'side': side,
+            'file': file,
+            'line': item.line,
+            'name': item.name,
+            'args': [param[0] for param in item.params],
+            'params': [{'name': name, 'type': type_, 'help': help_, 'optional': optional} for name, type_, help_, optional in item.params],
+            'returns': None,
+            'help': item.help_text,
+            'restricted': list(item.restricted),
+            'aliases': list(item.aliases),
+        }
+    params = item.arg_types if section == 'exports' else item.annotations
+    return {
+        'kind': KINDS[section],
+        'resource': resource,
+        'side': side,
+        'file': file,
+        'line': item.line,
+        'name': item.name,
+        'args': list(item.args),
+        'params': [{'name': name, 'type': type_} for name, type_ in params or ()],
+        'returns': getattr(item, 'return_type', None),
+    }
+
+
+class RecordStream:
+    """
+    Streams symbol records to *write*, one record per line, so nothing but
+    the current record is ever held and readers can go line by line.
+
+    ndjson: a header line `{"schema": ..., "version": ...}`, then one record per line.
+    json:   `{"schema": ..., "version": ..., "symbols": [` on the first line, one
+            record per line (comma separated), `]}` on the last.
+    """
+    def __init__(self, write: Callable[[str], None], output_format: str):
+        if output_format not in SUFFIXES:
+            raise ValueError(f'Unknown record format {output_format!r}')
+        self._write = write
+        self.format = output_format
+        self.records = 0
+        header = {'schema': SCHEMA, 'version': SCHEMA_VERSION}
+        if output_format == 'json':
+            write(_encode(header)[:-1] + ',"symbols":[')
+        else:
+            write(_encode(header) + '\n')
+
+    def write(self, record: dict):
+        self.write_encoded(_encode(record))
+
+    def write_encoded(self, line: str):
+        if self.format == 'json':
+            self._write(('\n' if not self.records else ',\n') + line)
+        else:
+            self._write(line + '\n')
+        self.records += 1
+
+    def close(self):
+        if self.format == 'json':
+            self._write('\n]}\n')
+
+
+def merge(paths: Iterable[str], stream: RecordStream):
+    """
+    Copy the records of several files written by RecordStream (same format)
+    into *stream*, line by line, without decoding them.
+    """
+    for path in paths:
+        with open(path, encoding='utf-8') as fh:
+            next(fh, None)  # -- header
+            for line in fh:
+                line = line.rstrip('\n')
+                if stream.format == 'json':
+                    if line == ']}':
+                        break
+                    line = line.rstrip(',')
+                if line:
+                    stream.write_encoded(line)
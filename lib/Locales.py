@@ -0,0 +1,115 @@
+import os
+import re
+import json
+from lib.Profiler import PROFILER
+from lib.LuaLexer import tokenize, OP, COMMENT, EOF
+
+# -- locale('key', ...) / Lang:t('key', ...) as kept in a table value's source text
+LOCALE_CALL_RE = re.compile(r'''^(?:locale|Lang:t)\(\s*(['"])(.+?)\1''')
+PREFERRED_LANGUAGES = ('en', 'en-us')
+
+
+def _whole_call(text: str) -> bool:
+    """True when the call *text* starts with also ends it, `locale('a') .. ' (admin)'` is more than a call."""
+    depth, closed = 0, False
+    for token in tokenize(text):
+        if token.kind == COMMENT:
+            continue
+        if closed:
+            return token.kind == EOF  # -- anything after the closing paren
+        if token.kind == OP and token.value == '(':
+            depth += 1
+        elif token.kind == OP and token.value == ')':
+            depth -= 1
+            closed = depth == 0
+    return False
+
+
+def flatten(data, prefix: str = '', out: dict = None) -> dict:
+    """Nested locale tables as dotted keys, the way ox_lib resolves them."""
+    out = {} if out is None else out
+    stack = [(prefix, data)]
+    while stack:
+        prefix, table = stack.pop()
+        for key, value in table.items():
+            if isinstance(value, dict):
+                stack.append((f'{prefix}{key}.', value))
+            elif isinstance(value, str):
+                out[f'{prefix}{key}'] = value
+    return out
+
+
+class Locales:
+    """
+    The locales/*.json files of one resource. Each language is read and
+    flattened the first time it's asked for and kept after that, so
+    rendering in one language never touches the others.
+    """
+    def __init__(self, resource_path: str, file_index, cache=None, language: str = None):
+        self.resource_path = resource_path
+        self.cache = cache
+        self.languages = sorted(name[:-len('.json')] for name in file_index.listdir('locales') or () if name.endswith('.json'))
+        # -- strings the chosen language lacks come from the default one, as ox_lib does
+        self.default = next((lang for lang in PREFERRED_LANGUAGES if lang in self.languages), None)
+        self.language = language if language in self.languages else self.default
+        self._strings = {}
+
+    def __repr__(self):
+        return f"Locales(languages={self.languages}, language={self.language}, loaded={sorted(self._strings)})"
+
+    def path(self, language: str) -> str:
+        return os.path.join(self.resource_path, 'locales', f'{language}.json')
+
+    def strings(self, language: str) -> dict[str, str]:
+        """Every key -> string of *language*, empty when it can't be read."""
+        if language not in self._strings:
+            self._strings[language] = self._load(language)
+        return self._strings[language]
+
+    def _load(self, language: str) -> dict[str, str]:
+        path = self.path(language)
+        cached = self.cache.get(path, 'locale') if self.cache else None
+        if cached is not None:
+            return cached
+        with PROFILER.span('locale.load', 'locale', file=path):
+            try:
+                with open(path, encoding='utf-8-sig') as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError) as e:
+                print(f"Unable to read locale {path}: {e}")
+                data = {}
+            strings = flatten(data) if isinstance(data, dict) else {}
+        if self.cache:
+            self.cache.put(path, 'locale', strings)
+        return strings
+
+    def text(self, key: str, language: str = None):
+        language = language or self.language
+        return self.strings(language).get(key) if language else None
+
+    def localize(self, text):
+        """
+        The string a `locale('key')` / `Lang:t('key')` *text* stands for, if
+        there is one. An expression the call is only part of stays as it is.
+        """
+        if not text or not self.language:
+            return text
+        m = LOCALE_CALL_RE.match(text)
+        if not m or not _whole_call(text):
+            return text
+        localized = self.text(m.group(2))
+        if localized is None and self.default:
+            localized = self.text(m.group(2), self.default)
+        return text if localized is None else localized
+
+    def report(self, used_keys) -> dict:
+        """Per language, keys the scripts use that it lacks and keys it has that nothing uses."""
+        used = set(used_keys)
+        report = {}
+        for language in self.languages:
+            keys = self.strings(language).keys()
+            report[language] = {
+                'missing': sorted(used.difference(keys)),
+                'unused': sorted(keys - used),
+            }
+        return report
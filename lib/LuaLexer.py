@@ -0,0 +1,369 @@
+import re
+from typing import Iterator, NamedTuple, Optional
+
+NAME = 'name'
+STRING = 'string'
+NUMBER = 'number'
+OP = 'op'
+COMMENT = 'comment'
+EOF = 'eof'
+
+_TOKEN_PATTERN = r'''
+      (?P<ws>[ \t\r\f\v\n]+)
+    | (?P<comment>--\[(?P<ceq>=*)\[(?:.*?\](?P=ceq)\]|.*)|--[^\n]*)    # -- unclosed long comments run to the end
+    | (?P<longstring>\[(?P<seq>=*)\[(?:.*?\](?P=seq)\]|.*))           # -- of the file, like Lua reads them
+    | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+    | (?P<badstring>["'][^\n]*)                          # -- unterminated, eat the rest of the line
+    | (?P<number>0[xX][0-9a-fA-F]*(?:\.[0-9a-fA-F]*)?(?:[pP][+-]?[0-9]+)?|(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<op>\.\.\.|\.\.|==|~=|<=|>=|::|<<|>>|//|[-+*/%^\#&~|<>=(){}\[\];:,.])
+    | (?P<other>.)
+    '''
+_TOKEN_RE = re.compile(_TOKEN_PATTERN, re.VERBOSE | re.DOTALL)
+# -- same grammar over raw bytes, so a script can be scanned straight out of an mmap
+_BYTES_TOKEN_RE = re.compile(_TOKEN_PATTERN.encode('ascii'), re.VERBOSE | re.DOTALL)
+
+_KIND = {
+    'comment': COMMENT,
+    'longstring': STRING,
+    'string': STRING,
+    'badstring': STRING,
+    'number': NUMBER,
+    'name': NAME,
+    'op': OP,
+    'other': OP,
+}
+
+
+class Token(NamedTuple):
+    kind: str
+    value: str
+    start: int
+    line: int
+    end: int
+
+
+def decode(data: bytes) -> str:
+    """UTF-8 if it is valid, otherwise cp1252 with replacement, which always succeeds."""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('cp1252', errors='replace')
+
+
+def tokenize(source) -> Iterator[Token]:
+    """
+    Yield the Lua tokens of *source* in order, skipping whitespace.
+    Comments are kept (annotations live in them), string and long-bracket
+    contents are never looked into, so code inside them can't match anything.
+
+    *source* may be a str, or bytes / an mmap. For bytes only names,
+    operators and `---` doc comments are decoded while lexing; string tokens
+    carry an empty value and other comments just '--', string_value() decodes
+    a string on demand. That keeps the cost of a huge bundled file to the
+    symbols that are actually extracted from it.
+    """
+    if isinstance(source, str):
+        yield from _tokenize_text(source)
+    else:
+        yield from _tokenize_bytes(source)
+
+
+def _tokenize_text(source: str) -> Iterator[Token]:
+    line = 1
+    for m in _TOKEN_RE.finditer(source):
+        group = m.lastgroup
+        if group == 'ws':
+            line += m.group().count('\n')
+            continue
+
+        value = m.group()
+        yield Token(_KIND[group], value, m.start(), line, m.end())
+        if group in ('comment', 'longstring', 'string'):
+            line += value.count('\n')
+
+    yield Token(EOF, '', len(source), line, len(source))
+
+
+def _tokenize_bytes(source) -> Iterator[Token]:
+    line = 1
+    words = {}  # -- names and operators repeat endlessly, decode each spelling once
+    for m in _BYTES_TOKEN_RE.finditer(source):
+        group = m.lastgroup
+        if group == 'ws':
+            line += m.group().count(b'\n')
+            continue
+
+        start, end = m.span()
+        if group in ('name', 'op'):
+            raw = m.group()
+            value = words.get(raw)
+            if value is None:
+                if len(words) > 4096:
+                    words.clear()  # -- keep memory flat on files full of unique names
+                value = words[raw] = raw.decode('latin-1')
+            yield Token(_KIND[group], value, start, line, end)
+        elif group == 'comment':
+            if source[start:start + 3] == b'---':
+                value = decode(m.group())
+            else:
+                value = '--'
+            yield Token(COMMENT, value, start, line, end)
+            line += _count_newlines(source, start, end)
+        elif group in ('string', 'longstring', 'badstring'):
+            yield Token(STRING, '', start, line, end)
+            if group != 'badstring':
+                line += _count_newlines(source, start, end)
+        else:
+            yield Token(_KIND[group], m.group().decode('latin-1'), start, line, end)
+
+    yield Token(EOF, '', len(source), line, len(source))
+
+
+def _count_newlines(source, start: int, end: int) -> int:
+    # -- mmap has find() but no count(), and slicing a long comment just to count would copy it
+    count = 0
+    position = source.find(b'\n', start, end)
+    while position != -1:
+        count += 1
+        position = source.find(b'\n', position + 1, end)
+    return count
+
+
+def string_value(token: Token, source) -> str:
+    """Strip the quotes (or long brackets) from a STRING token of *source*."""
+    value = source[token.start:token.end]
+    if not isinstance(value, str):
+        value = decode(value)
+    if value[0] == '[':
+        level = value.index('[', 1) + 1
+        closing = ']' + '=' * (level - 2) + ']'
+        value = value[level:-level] if value.endswith(closing) and len(value) >= 2 * level else value[level:]
+        # -- like Lua, a newline right after the opening bracket isn't part of the string
+        return value[2:] if value.startswith('\r\n') else value[1:] if value[:1] == '\n' else value
+    if len(value) > 1 and value[-1] == value[0]:
+        return value[1:-1]
+    return value[1:]
+
+
+def source_text(source, start: int, end: int) -> str:
+    """Decoded text of *source* between two offsets."""
+    value = source[start:end]
+    return value if isinstance(value, str) else decode(value)
+
+
+_MISSING = object()
+_OPENERS = ('(', '[', '{')
+_CLOSERS = (')', ']', '}')
+# -- keywords opening / closing a block, so `function() local a, b = 1, 2 end` stays one value
+_BLOCK_OPENERS = ('function', 'if', 'do', 'repeat')
+_BLOCK_CLOSERS = ('end', 'until')
+# -- can't appear in a table constructor outside a function body: the table was never closed
+_STATEMENT_KEYWORDS = ('local', 'return', 'end', 'until', 'while', 'for', 'in', 'break', 'goto', 'then', 'else', 'elseif')
+_OPERATOR_KEYWORDS = ('and', 'or', 'not')
+# -- tokens read_table looks at before it gives up, so an unclosed table can't pull a whole file into the lookahead
+MAX_TABLE_TOKENS = 1 << 16
+
+
+class _TableFrame:
+    """One table constructor being read by TokenStream.read_table."""
+    __slots__ = ('fields', 'items', 'key', 'table', 'first', 'last', 'count', 'depth')
+
+    def __init__(self):
+        self.fields = {}
+        self.items = []
+        self.reset()
+
+    def reset(self):
+        self.key = None
+        self.table = _MISSING  # -- a nested constructor given as the value
+        self.first = self.last = None  # -- first and last token of any other value
+        self.count = 0
+        self.depth = 0  # -- brackets and blocks open inside the current value
+
+    def add(self, token: Token, value):
+        if self.first is None:
+            self.first = token
+        self.last = token
+        self.count += 1
+        if value in _OPENERS or (token.kind == NAME and token.value in _BLOCK_OPENERS):
+            self.depth += 1
+        elif value in _CLOSERS or (token.kind == NAME and token.value in _BLOCK_CLOSERS):
+            self.depth -= 1
+
+    def complete(self) -> bool:
+        """True once the current value could end here, a name can't follow it without a separator."""
+        last = self.last
+        if last is None:
+            return self.table is not _MISSING
+        if self.depth:
+            return False
+        if last.kind == NAME:
+            return last.value not in _OPERATOR_KEYWORDS
+        return last.kind in (STRING, NUMBER) or last.value in (')', ']', '}', '...')
+
+    def commit(self, source):
+        if self.count == 1:
+            value = _literal(self.first, source)
+        elif self.count:
+            value = source_text(source, self.first.start, self.last.end)
+        else:
+            value = self.table
+        if value is not _MISSING:
+            if self.key is None:
+                self.items.append(value)
+            else:
+                self.fields[self.key] = value
+        self.reset()
+
+    def result(self):
+        if not self.fields:
+            return self.items
+        table = dict(self.fields)
+        for index, value in enumerate(self.items, 1):
+            table.setdefault(index, value)
+        return table
+
+
+def _literal(token: Token, source):
+    if token.kind == STRING:
+        return string_value(token, source)
+    if token.kind == NAME and token.value in ('true', 'false', 'nil'):
+        return {'true': True, 'false': False, 'nil': None}[token.value]
+    return source_text(source, token.start, token.end)
+
+
+class TokenStream:
+    """
+    Forward-only view over a token iterator with a small lookahead buffer, so
+    extractors can peek at the next few tokens without the whole file's
+    token list ever being materialised.
+    """
+    def __init__(self, source):
+        self.source = source
+        self._tokens = tokenize(source)
+        # -- a list plus a read position rather than a deque: peeking far ahead (a whole table
+        # -- constructor) must stay O(1) per token
+        self._buffer = []
+        self._head = 0
+        self._eof = Token(EOF, '', len(source), 0, len(source))
+
+    def peek(self, offset: int = 0) -> Token:
+        index = self._head + offset
+        while len(self._buffer) <= index:
+            self._buffer.append(next(self._tokens, self._eof))
+        return self._buffer[index]
+
+    def next(self) -> Token:
+        if self._buffer:
+            token = self._buffer[self._head]
+            self._head += 1
+            if self._head == len(self._buffer):
+                self._buffer.clear()
+                self._head = 0
+            return token
+        return next(self._tokens, self._eof)
+
+    def string(self, offset: int) -> str:
+        """Decoded contents of the STRING token at *offset*."""
+        return string_value(self.peek(offset), self.source)
+
+    def match(self, offset: int, *values: str) -> bool:
+        """True if the tokens starting at *offset* have exactly *values*."""
+        for i, value in enumerate(values):
+            token = self.peek(offset + i)
+            if token.kind in (STRING, COMMENT, EOF) or token.value != value:
+                return False
+        return True
+
+    def read_name(self, offset: int, first: Optional[Token] = None) -> Optional[tuple[str, int]]:
+        """
+        Read a dotted name `a.b:c` starting at *offset*, or right after *first*
+        when its leading segment was already consumed. Returns the name and the
+        offset just after it.
+        """
+        if first is None:
+            first = self.peek(offset)
+            if first.kind != NAME:
+                return None
+        parts = [first.value]
+        offset += 1
+        while True:
+            separator, name = self.peek(offset), self.peek(offset + 1)
+            if separator.kind != OP or separator.value not in ('.', ':') or name.kind != NAME:
+                return ''.join(parts), offset
+            parts += (separator.value, name.value)
+            offset += 2
+
+    def read_args(self, offset: int) -> Optional[tuple[list[str], int]]:
+        """
+        Read a parameter list `( a, b, ... )` starting at *offset*. Returns the
+        argument names and the offset just after the closing paren.
+        """
+        if not self.match(offset, '('):
+            return None
+        args = []
+        offset += 1
+        while True:
+            token = self.peek(offset)
+            if token.kind == EOF:
+                return None
+            if token.kind == OP and token.value == ')':
+                return args, offset + 1
+            if token.kind == NAME or token.value == '...':
+                args.append(token.value)
+            elif token.kind != COMMENT and token.value != ',':
+                return None
+            offset += 1
+
+    def read_table(self, offset: int, limit: int = MAX_TABLE_TOKENS) -> tuple[object, int]:
+        """
+        Read a table constructor `{ ... }` starting at *offset* in a single
+        forward pass; nesting is tracked with an explicit stack so depth costs
+        nothing. Values come back as Python data: decoded strings, True /
+        False / None, dicts for tables with `key = value` fields (plain
+        entries go under 1, 2, ...), lists for plain lists, and the source
+        text of anything else. Returns the table and the offset just after
+        it, or None and the offset reached when it isn't one or never closes:
+        at the end of the file, at a statement keyword or a new statement
+        (`{ a = f() g()`) that can't be part of it, or after *limit* tokens.
+        """
+        if not self.match(offset, '{'):
+            return None, offset
+        stack = [_TableFrame()]
+        limit += offset
+        offset += 1
+        while True:
+            token = self.peek(offset)
+            kind = token.kind
+            if kind == EOF or offset >= limit:
+                return None, offset
+            offset += 1
+            if kind == COMMENT:
+                continue
+
+            frame = stack[-1]
+            value = token.value if kind == OP else None
+            if kind == NAME and not frame.depth and (token.value in _STATEMENT_KEYWORDS or
+                                                     (token.value not in _OPERATOR_KEYWORDS and frame.complete())):
+                return None, offset - 1
+            if frame.depth:
+                frame.add(token, value)
+            elif value in (',', ';'):
+                frame.commit(self.source)
+            elif value == '}':
+                frame.commit(self.source)
+                stack.pop()
+                if not stack:
+                    return frame.result(), offset
+                stack[-1].table = frame.result()
+            elif frame.key is None and not frame.count and kind == NAME and self.match(offset, '='):
+                frame.key = token.value  # -- name = value
+                offset += 1
+            elif frame.key is None and not frame.count and value == '[' and self.peek(offset).kind == STRING and self.match(offset + 1, ']', '='):
+                frame.key = self.string(offset)  # -- ['name'] = value
+                offset += 3
+            elif value == '{' and not frame.count and frame.table is _MISSING:
+                stack.append(_TableFrame())
+            else:
+                frame.add(token, value)
@@ -1,7 +1,9 @@
-import re
 import os
-import glob
 from textwrap import dedent
+from typing import NamedTuple
+from lib.LuaLexer import tokenize, string_value, NAME, STRING, OP, COMMENT, EOF
+from lib.FileIndex import FileIndex, normalise
+from lib.Profiler import PROFILER
 
 SUCCESS = '\u2705'  # Check mark
 FAILURE = '\u274C'  # Cross mark
@@ -12,36 +14,95 @@ def _is_glob(path: str) -> bool:
     """True if the manifest path contains any glob metacharacter."""
     return any(c in path for c in GLOB_CHARS)
 
+
+class Directive(NamedTuple):
+    name: str
+    values: list[str]
+    line: int
+
+
+def parse_directives(content: str) -> list[Directive]:
+    """
+    Every directive of a manifest in file order, in one pass over its tokens.
+    Handles `name 'value'`, `name "value"`, `name [[value]]`, `name { ... }`
+    tables (comments and nesting included), call style `name('value')` and
+    chained values like `data_file 'TYPE' 'path'`. Each string found in the
+    arguments ends up in *values*, in order.
+    """
+    directives = []
+    tokens = tokenize(content)
+    token = next(tokens)
+    while token.kind != EOF:
+        if token.kind != NAME:
+            token = next(tokens)
+            continue
+
+        name, line, values = token.value, token.line, []
+        token = next(tokens)
+        while token.kind == COMMENT:
+            token = next(tokens)
+
+        depth, found = 0, False
+        while token.kind != EOF:
+            if token.kind == STRING:
+                values.append(string_value(token, content))
+                found = True
+            elif token.kind == OP and token.value in ('{', '('):
+                depth += 1
+                found = True
+            elif token.kind == OP and token.value in ('}', ')'):
+                depth -= 1
+            elif token.kind == COMMENT or depth > 0:
+                pass
+            else:
+                break
+            token = next(tokens)
+
+        if found:
+            directives.append(Directive(name, values, line))
+
+    return directives
+
 class Manifest:
-    def __init__(self, manifest_path):
+    def __init__(self, manifest_path, cache=None):
         self.manifest_path = os.path.join(manifest_path, 'fxmanifest.lua')
-        self.manifest_content = self._read_manifest()
         self.resource_path = manifest_path
-        self.resource = self.resource_path.split('\\')[-1]
-        self.description = self._get_description()
-        self.shared_scripts = self._get_shared_scripts()
-        self.client_scripts = self._get_client_scripts()
-        self.server_scripts = self._get_server_scripts()
+
+        cached = cache.get(self.manifest_path, 'manifest') if cache else None
+        if cached is not None and cached['resource_path'] == self.resource_path:
+            self.__dict__.update(cached)
+            return
+
+        self.resource = os.path.basename(os.path.normpath(self.resource_path))
+        with PROFILER.span('manifest.read', 'manifest', resource=self.resource, file=self.manifest_path):
+            self.manifest_content = self._read_manifest()
+            self.directives = parse_directives(self.manifest_content)
+        with PROFILER.span('manifest.index', 'index', resource=self.resource):
+            self.file_index = FileIndex(self.resource_path)
+        self.fx_version = self._first('fx_version')
+        self.version = self._first('version')
+        self.description = self._first('description', "No description found")
+        self.shared_scripts = self._values('shared_script', 'shared_scripts')
+        self.client_scripts = self._values('client_script', 'client_scripts')
+        self.server_scripts = self._values('server_script', 'server_scripts')
+        self.files = self._values('file', 'files')
+        self.ui_page = self._first('ui_page')
+        self.dependencies = self._values('dependency', 'dependencies')
+        self.provides = self._values('provide', 'provides')
+        self.escrow_ignore = self._values('escrow_ignore')
+        self.lua54 = self._first('lua54') == 'yes'
         self.locales = self._get_locales()
-        if self.locales:
-            self.english_locale = True if 'en' in self.locales or 'en-us' in self.locales else False
-        else:
-            self.english_locale = False
-        
-        if self.english_locale and self.locales:
-            if 'en' in self.locales:
-                if os.path.exists(os.path.join(self.resource_path, 'locales', 'en.json')):
-                    self.english_locale_path = os.path.join(self.resource_path, 'locales', 'en.json')
-            elif 'en-us' in self.locales:
-                if os.path.exists(os.path.join(self.resource_path, 'locales', 'en-us.json')):
-                    self.english_locale_path = os.path.join(self.resource_path, 'locales', 'en-us.json')
-            else:
-                self.english_locale_path = None
 
         self._filter_imports()
-        self.shared_scripts = self._expand(self.shared_scripts)
-        self.client_scripts = self._expand(self.client_scripts)
-        self.server_scripts = self._expand(self.server_scripts)
+        with PROFILER.span('manifest.expand', 'glob', resource=self.resource):
+            self.shared_scripts = self._expand(self.shared_scripts)
+            self.client_scripts = self._expand(self.client_scripts)
+            self.server_scripts = self._expand(self.server_scripts)
+
+        if cache:
+            # -- the file index (and so globs and the locale list) goes stale when any folder changes
+            state = {k: v for k, v in self.__dict__.items() if k != 'manifest_content'}
+            cache.put(self.manifest_path, 'manifest', state, depends_on=self.file_index.directories)
 
     def __repr__(self):
         return dedent(f"""\
@@ -52,8 +113,11 @@ class Manifest:
                 shared_scripts={self.shared_scripts}, 
                 client_scripts={self.client_scripts}, 
                 server_scripts={self.server_scripts},
+                files={self.files},
+                ui_page={self.ui_page},
+                dependencies={self.dependencies},
+                lua54={self.lua54},
                 locales={self.locales},
-                {SUCCESS if self.english_locale else FAILURE} english locale detected,
 
                 imports:
                 {SUCCESS if self.uses_ox_lib else FAILURE} ox_lib,
@@ -65,119 +129,51 @@ class Manifest:
 
     def _read_manifest(self):
         try:
-            with open(self.manifest_path, 'r') as file:
+            with open(self.manifest_path, 'r', encoding='utf-8', errors='replace') as file:
                 return file.read()
         except OSError as e:
             raise Exception(f"Error reading manifest file: {e}")
 
-    def _get_description(self) -> str:
-        description_match = re.search(r"^description\s*['|\"](.*)['|\"]\s*$", self.manifest_content, re.MULTILINE)
-        if description_match:
-            return description_match.group(1)
-        else:
-            return "No description found"
-        
-    def _get_shared_scripts(self) -> list[str]:
-        shared_script_match = re.search(r"^shared_script\s*['|\"](.*)['|\"]\s*$", self.manifest_content, re.MULTILINE)
-        if shared_script_match:
-            return [shared_script_match.group(1)]
-
-        else:
-            shared_scripts_match = re.search(r"^shared_scripts\s*\{([^}]*)\}", self.manifest_content, re.MULTILINE | re.DOTALL)
-            if shared_scripts_match:
-                return re.findall(r'[\"\']([^\"\']+)[\"\']', shared_scripts_match.groups()[0], re.MULTILINE | re.DOTALL)
-            else: 
-                return []
-            
-    def _get_client_scripts(self) -> list[str]:
-        client_script_match = re.search(r"^client_script\s*['|\"](.*)['|\"]\s*$", self.manifest_content, re.MULTILINE)
-        if client_script_match:
-            return [client_script_match.group(1)]
-        else:
-            client_scripts_match = re.search(r"^client_scripts\s*\{([^}]*)\}", self.manifest_content, re.MULTILINE | re.DOTALL)
-            if client_scripts_match:
-                return re.findall(r'[\"\']([^\"\']+)[\"\']', client_scripts_match.groups()[0], re.MULTILINE | re.DOTALL)
-            
-            else: 
-                return []
-            
-    def _get_server_scripts(self) -> list[str]:
-        server_script_match = re.search(r"^server_script\s*['|\"](.*)['|\"]\s*$", self.manifest_content, re.MULTILINE)
-        if server_script_match:
-            return [server_script_match.group(1)]
-        else:
-            server_scripts_match = re.search(r"^server_scripts\s*\{([^}]*)\}", self.manifest_content, re.MULTILINE | re.DOTALL)
-            if server_scripts_match:
-                return re.findall(r'[\"\']([^\"\']+)[\"\']', server_scripts_match.groups()[0], re.MULTILINE | re.DOTALL)
-            else: 
-                return []
-            
+    def _values(self, *names: str) -> list[str]:
+        """Values of every occurrence of the given directive names, in manifest order."""
+        return [value for directive in self.directives if directive.name in names for value in directive.values]
+
+    def _first(self, name: str, default=None):
+        for directive in self.directives:
+            if directive.name == name and directive.values:
+                return directive.values[0]
+        return default
+
     def _filter_imports(self):
-        if '@ox_lib/init.lua' in self.shared_scripts:
-            self.shared_scripts.remove('@ox_lib/init.lua')
-            self.uses_ox_lib = True
-        else:
-            self.uses_ox_lib = False
-
-        if '@qbx_core/modules/lib.lua' in self.shared_scripts:
-            self.shared_scripts.remove('@qbx_core/modules/lib.lua')
-            self.uses_qbx_lib = True
-        else:
-            self.uses_qbx_lib = False
-
-        if '@oxmysql/lib/MySQL.lua' in self.server_scripts:
-            self.server_scripts.remove('@oxmysql/lib/MySQL.lua')
-            self.uses_oxmysql = True
-        else:
-            self.uses_oxmysql = False
-
-        if '@qbx_core/modules/playerdata.lua' in self.client_scripts:
-            self.client_scripts.remove('@qbx_core/modules/playerdata.lua')
-            self.uses_qbx_playerdata = True
-        else:
-            self.uses_qbx_playerdata = False
-
-        shared_imports = [x for x in self.shared_scripts if x.startswith('@')]
-        for import_ in shared_imports:
-            self.shared_scripts.remove(import_)
-
-        client_imports = [x for x in self.client_scripts if x.startswith('@')]
-        for import_ in client_imports:
-            self.client_scripts.remove(import_)
-
-        server_imports = [x for x in self.server_scripts if x.startswith('@')]
-        for import_ in server_imports:
-            self.server_scripts.remove(import_)
-
-        self.uncommon_imports = list(set(shared_imports + client_imports + server_imports))
+        # -- every `@resource/file` each side loads, the well known ones included, for the ImportResolver.
+        # -- The script lists keep the resource's own files only
+        sides = ('shared', 'client', 'server')
+        self.imports = {side: [x for x in getattr(self, f'{side}_scripts') if x.startswith('@')] for side in sides}
+        for side in sides:
+            setattr(self, f'{side}_scripts', [x for x in getattr(self, f'{side}_scripts') if not x.startswith('@')])
+
+        self.uses_ox_lib = '@ox_lib/init.lua' in self.imports['shared']
+        self.uses_qbx_lib = '@qbx_core/modules/lib.lua' in self.imports['shared']
+        self.uses_oxmysql = '@oxmysql/lib/MySQL.lua' in self.imports['server']
+        self.uses_qbx_playerdata = '@qbx_core/modules/playerdata.lua' in self.imports['client']
 
     def _get_locales(self) -> list[str]:
-        if os.path.exists(os.path.join(self.resource_path, 'locales')):
-            locales = os.listdir(os.path.join(self.resource_path, 'locales'))
+        locales = self.file_index.listdir('locales')
+        if locales is not None:
             return [locale.split('.')[0] for locale in locales]
 
     def _expand(self, manifest_paths: list[str]) -> list[str]:
         """
-        Expand globs relative to *self.resource_path*, return unique forward-slash
-        paths in manifest order.
+        Expand globs against the resource's file index, return unique
+        forward-slash paths in manifest order.
         """
-        root_escaped = glob.escape(self.resource_path)       # ← NEW
         seen, resolved = set(), []
 
         for entry in manifest_paths:
-            if not _is_glob(entry):
-                if entry not in seen:
-                    resolved.append(entry); seen.add(entry)
-                continue
-
-            # build an OS-native pattern, but the *root* part is now escaped
-            pattern = os.path.join(root_escaped, *entry.split('/'))
-
-            # recursive=True lets ** work
-            for hit in sorted(glob.glob(pattern, recursive=True)):
-                rel = os.path.relpath(hit, self.resource_path).replace(os.sep, '/')
+            entry = normalise(entry)
+            hits = self.file_index.match(entry) if _is_glob(entry) else [entry]
+            for rel in hits:
                 if rel not in seen:
                     resolved.append(rel); seen.add(rel)
 
         return resolved
-
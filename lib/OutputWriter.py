@@ -0,0 +1,167 @@
+import os
+import tempfile
+from lib.Profiler import PROFILER
+
+# -- mkstemp creates 0600 files, docs pages should get the usual permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class OutputWriter:
+    """
+    Incremental writer for one output directory.
+
+    Files are written only when their rendered content differs from what is
+    on disk, through a temp file + rename so a reader never sees half a page.
+    Anything under the directory with a *managed* suffix that was not produced
+    during the run is removed by finish(), everything else is left alone.
+    """
+    def __init__(self, directory: str, managed_suffixes: tuple[str, ...] = ('.mdx',), buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.directory = directory
+        self.managed_suffixes = managed_suffixes
+        self.produced = set()
+        self.written = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.bytes_written = 0
+        self.buffer_size = buffer_size
+
+    def __repr__(self):
+        return f"OutputWriter(directory={self.directory}, written={self.written}, unchanged={self.unchanged}, removed={self.removed})"
+
+    def stats(self) -> dict:
+        return {'written': self.written, 'unchanged': self.unchanged, 'removed': self.removed, 'bytes_written': self.bytes_written}
+
+    def open(self, relative_path: str) -> 'PageStream':
+        """Stream a page to *relative_path* (forward slashes), see PageStream."""
+        path = os.path.join(self.directory, *relative_path.split('/'))
+        self.produced.add(os.path.normpath(path))
+        return PageStream(self, path, self.buffer_size)
+
+    def write(self, relative_path: str, content: str):
+        """Write *content* to *relative_path* unless it is already there."""
+        with self.open(relative_path) as page:
+            page.write(content)
+
+    def discard(self, relative_path: str):
+        """Remove a page that no longer has anything to show."""
+        path = os.path.join(self.directory, *relative_path.split('/'))
+        try:
+            os.remove(path)
+            self.removed += 1
+        except FileNotFoundError:
+            pass
+
+    def finish(self) -> dict:
+        """Remove managed files that weren't produced this run, then any folders left empty."""
+        if not os.path.isdir(self.directory):
+            return self.stats()
+
+        for directory, _, files in os.walk(self.directory, topdown=False):
+            for name in files:
+                path = os.path.normpath(os.path.join(directory, name))
+                if name.endswith(self.managed_suffixes) and path not in self.produced:
+                    os.remove(path)
+                    self.removed += 1
+            if directory != self.directory and not os.listdir(directory):
+                os.rmdir(directory)
+
+        return self.stats()
+
+
+class PageStream:
+    """
+    Buffered, write-only stream for one page. Rendered text is collected up
+    to *buffer_size* characters, then encoded and compared against the same
+    stretch of the file already on disk. Nothing is written while the two
+    agree; on the first difference the verified prefix is copied into a temp
+    file and the rest streams after it. On close the temp file replaces the
+    page, or is never created at all if the page came out identical.
+    """
+    def __init__(self, writer: OutputWriter, path: str, buffer_size: int):
+        self.writer = writer
+        self.path = path
+        self.buffer_size = buffer_size
+        self._parts = []
+        self._buffered = 0
+        self._matched = 0
+        self._tmp = None
+        self._tmp_path = None
+        try:
+            self._existing = open(path, 'rb')
+        except OSError:
+            self._existing = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._abort()
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._parts:
+            return
+        with PROFILER.span('page.flush', 'write', page=self.path):
+            self._flush_parts()
+
+    def _flush_parts(self):
+        data = ''.join(self._parts).encode('utf-8')
+        self._parts, self._buffered = [], 0
+
+        if self._tmp is None:
+            if self._existing is not None and self._existing.read(len(data)) == data:
+                self._matched += len(data)
+                return
+            self._diverge()
+        self._tmp.write(data)
+        self.writer.bytes_written += len(data)
+
+    def _diverge(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+        self._tmp = os.fdopen(fd, 'wb')
+        if self._existing is not None:
+            if self._matched:
+                self._existing.seek(0)
+                self._tmp.write(self._existing.read(self._matched))
+                self.writer.bytes_written += self._matched
+            self._existing.close()
+            self._existing = None
+
+    def close(self):
+        self._flush()
+        if self._tmp is None:
+            if self._existing is not None and not self._existing.read(1):
+                self._existing.close()
+                self.writer.unchanged += 1
+                return
+            self._diverge()  # -- the page got shorter, or never existed
+
+        with PROFILER.span('page.replace', 'write', page=self.path):
+            try:
+                self._tmp.close()
+                os.chmod(self._tmp_path, 0o666 & ~_UMASK)
+                os.replace(self._tmp_path, self.path)
+            except OSError:
+                self._abort()
+                raise
+        self.writer.written += 1
+
+    def _abort(self):
+        if self._existing is not None:
+            self._existing.close()
+        if self._tmp is not None:
+            self._tmp.close()
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
@@ -0,0 +1,154 @@
+import os
+import pickle
+import hashlib
+import tempfile
+from lib.Profiler import PROFILER
+
+DEFAULT_CACHE_DIR = '.qbox-doc-cache'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_FORMAT = 1
+
+
+def _tool_version() -> str:
+    """
+    Stamp of the parser code itself, every lib module feeds into it. Any edit
+    to how files are parsed invalidates the whole cache without anyone having
+    to remember to bump a number.
+    """
+    digest = hashlib.sha1(str(CACHE_FORMAT).encode())
+    lib_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(lib_dir)):
+        if name.endswith('.py'):
+            with open(os.path.join(lib_dir, name), 'rb') as fh:
+                digest.update(fh.read())
+    return digest.hexdigest()
+
+
+TOOL_VERSION = _tool_version()
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    On-disk cache of parse results, one pickle per (kind, source file).
+
+    An entry is valid while the source file's size and mtime are unchanged,
+    if only the mtime moved the content hash decides. Paths listed in
+    *depends_on* when storing (directories a glob walked, ...) must also keep
+    their mtime. Entries written by another version of the parser are ignored.
+    """
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"ParseCache(directory={self.directory}, hits={self.hits}, misses={self.misses})"
+
+    def _entry_path(self, path: str, kind: str) -> str:
+        key = hashlib.sha1(f'{kind}:{os.path.realpath(path)}'.encode()).hexdigest()
+        return os.path.join(self.directory, key[:2], key[2:] + '.pickle')
+
+    def get(self, path: str, kind: str):
+        """Cached value for *path*, or None when there is none or it went stale."""
+        with PROFILER.span('cache.get', 'cache', file=path):
+            value = self._get(path, kind)
+        PROFILER.count('cache.hits' if value is not None else 'cache.misses')
+        return value
+
+    def _get(self, path: str, kind: str):
+        entry_path = self._entry_path(path, kind)
+        try:
+            stat = os.stat(path)
+            with open(entry_path, 'rb') as fh:
+                entry = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            self.misses += 1
+            return None
+
+        if entry.get('version') != TOOL_VERSION or entry['size'] != stat.st_size or not self._depends_valid(entry):
+            self.misses += 1
+            return None
+
+        if entry['mtime_ns'] != stat.st_mtime_ns:
+            # -- touched but maybe not changed (checkout, copy, ...), let the content decide
+            if _file_digest(path) != entry['digest']:
+                self.misses += 1
+                return None
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self._write(entry_path, entry)
+
+        self.hits += 1
+        return entry['value']
+
+    def put(self, path: str, kind: str, value, depends_on=()):
+        with PROFILER.span('cache.put', 'cache', file=path):
+            self._put(path, kind, value, depends_on)
+
+    def _put(self, path: str, kind: str, value, depends_on):
+        try:
+            stat = os.stat(path)
+            entry = {
+                'version': TOOL_VERSION,
+                'path': path,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'digest': _file_digest(path),
+                'depends': {dep: os.stat(dep).st_mtime_ns for dep in depends_on},
+                'value': value,
+            }
+        except OSError:
+            return
+        self._write(self._entry_path(path, kind), entry)
+
+    def _depends_valid(self, entry) -> bool:
+        for dep, mtime_ns in entry['depends'].items():
+            try:
+                if os.stat(dep).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _write(self, entry_path: str, entry):
+        # -- temp file + rename, several worker processes may share the cache
+        directory = os.path.dirname(entry_path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as fh:
+                pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except OSError as e:
+            print(f"Unable to write cache entry {entry_path}: {e}")
+
+    def prune(self):
+        """Evict the oldest entries until the cache fits in *max_bytes*."""
+        entries, total = [], 0
+        for directory, _, files in os.walk(self.directory):
+            for name in files:
+                entry_path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(entry_path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,72 @@
+import threading
+from queue import Queue
+from collections import deque
+
+DEFAULT_QUEUE_SIZE = 4
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def bounded(items, maxsize: int = DEFAULT_QUEUE_SIZE):
+    """
+    Pull *items* (any iterable, usually the previous stage's generator) on a
+    background thread while the caller works on what it already got. At most
+    *maxsize* items wait in between, so a fast stage can't run away from a
+    slow one. An exception in the stage is raised again in the caller.
+    """
+    queue = Queue(maxsize)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            iterator = iter(items)
+            # -- checked before pulling, so a stopped stage doesn't produce one more item nobody wants
+            while not stop.is_set():
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                queue.put(item)
+            else:
+                return
+        except BaseException as e:
+            queue.put(_Failed(e))
+            return
+        queue.put(_DONE)
+
+    thread = threading.Thread(target=produce, name='pipeline-stage', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        # -- the consumer stopped early: let the producer notice and unblock it
+        stop.set()
+        while thread.is_alive():
+            while not queue.empty():
+                queue.get_nowait()
+            thread.join(0.01)
+
+
+def ordered_map(pool, fn, items, window: int):
+    """
+    `pool.submit(fn, item)` for every item with at most *window* in flight,
+    results handed back in *items* order. Nothing is submitted ahead of what
+    the caller consumes, so memory stays bounded however many items there are.
+    """
+    in_flight = deque()
+    for item in items:
+        in_flight.append(pool.submit(fn, item))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import threading
+from collections import Counter, defaultdict
+
+
+class _NoSpan:
+    """What span() hands out while profiling is off, so hooks cost next to nothing."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    def __init__(self, profiler, name, category, args):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+        self.child_ns = 0
+
+    def __enter__(self):
+        self.stack = self.profiler._stack()
+        self.stack.append(self)
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter_ns() - self.started
+        self.stack.pop()
+        if self.stack:
+            self.stack[-1].child_ns += duration
+        self.profiler.events.append({
+            'name': self.name,
+            'cat': self.category,
+            'ts': self.started // 1000,
+            'dur': duration // 1000,
+            'self': (duration - self.child_ns) // 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': self.args,
+        })
+        return False
+
+
+class Profiler:
+    """
+    Timing spans around each build phase plus named counters. Disabled by
+    default; every hook then goes through one attribute check. Spans nest, and
+    each records its own time minus its children's so phases don't double count.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.counters = Counter()
+        self._local = threading.local()
+
+    def enable(self):
+        self.enabled = True
+
+    def reset(self):
+        self.events = []
+        self.counters = Counter()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str, category: str, **args):
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name, category, args)
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled and amount:
+            self.counters[name] += amount
+
+    def merge(self, events: list[dict], counters: dict):
+        """Fold in what a worker process recorded."""
+        self.events.extend(events)
+        self.counters.update(counters)
+
+    def write_trace(self, path: str):
+        """Chrome trace-event file, open it in chrome://tracing or Perfetto."""
+        trace = {
+            'traceEvents': [
+                {'name': e['name'], 'cat': e['cat'], 'ph': 'X', 'ts': e['ts'], 'dur': e['dur'],
+                 'pid': e['pid'], 'tid': e['tid'], 'args': e['args']}
+                for e in self.events
+            ],
+            'displayTimeUnit': 'ms',
+            'otherData': {'counters': dict(self.counters)},
+        }
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(trace, fh)
+
+    def report(self, top: int = 15) -> str:
+        lines = []
+        phases = defaultdict(lambda: [0, 0])
+        resources = defaultdict(int)
+        for e in self.events:
+            phases[e['cat']][0] += e['self']
+            phases[e['cat']][1] += 1
+            if 'resource' in e['args']:
+                resources[e['args']['resource']] += e['self']
+
+        lines.append(f'{"phase":<24}{"self ms":>12}{"spans":>8}')
+        for category, (self_us, spans) in sorted(phases.items(), key=lambda kv: -kv[1][0]):
+            lines.append(f'{category:<24}{self_us / 1000:>12.2f}{spans:>8}')
+
+        lines.append('')
+        lines.append(f'Top {top} slowest spans')
+        lines.append(f'{"span":<24}{"ms":>10}{"self ms":>10}  target')
+        for e in sorted(self.events, key=lambda e: -e['dur'])[:top]:
+            target = e['args'].get('file') or e['args'].get('page') or e['args'].get('resource', '')
+            lines.append(f'{e["name"]:<24}{e["dur"] / 1000:>10.2f}{e["self"] / 1000:>10.2f}  {target}')
+
+        if resources:
+            lines.append('')
+            lines.append(f'Top {top} slowest resources (self time of their spans)')
+            for resource, self_us in sorted(resources.items(), key=lambda kv: -kv[1])[:top]:
+                lines.append(f'{resource:<40}{self_us / 1000:>10.2f} ms')
+
+        if self.counters:
+            lines.append('')
+            lines.append('Counters: ' + ', '.join(f'{name}={value}' for name, value in sorted(self.counters.items())))
+        return '\n'.join(lines)
+
+
+PROFILER = Profiler()
@@ -1,339 +1,703 @@
 from lib.ManifestReader import Manifest
+from lib.LuaLexer import TokenStream, NAME, STRING, OP, COMMENT, EOF
+from lib.SymbolTable import SymbolTable
+from lib.OutputWriter import OutputWriter
+from lib.TemplateRenderer import default_renderer
+from lib.JsonExport import RecordStream, SUFFIXES, KINDS, symbol_record
+from lib.Locales import Locales
+from lib.Profiler import PROFILER
 import os
 import re
-import json
-import shutil
+from sys import intern
+import mmap
 import itertools
-from textwrap import dedent
 
-class Event:
-    def __init__(self, name: str, args: list[str], annotations: list[tuple[str, str]]):
-        self.name = name
-        self.args = args
-        self.annotations = annotations
+PARAM_RE = re.compile(r'^---@param[ \t]+(\w+)[ \t]+([^\s]+)')
+RETURN_RE = re.compile(r'^---@return[ \t]+([^\s]+)')
 
-    def __repr__(self):
-        return f"Event(name={self.name}, args={self.args}, annotations={self.annotations})"
-    
-    def to_mdx(self):
-        mdx = dedent(f"""\
-        ### {self.name.split(':')[-1]}
-        
-        Triggered when a player.. #TODO: finish
-        ```lua
-        RegisterNetEvent('{self.name}', function({', '.join(self.args)}) end)
-        ```
-        """
-        )
+def _params(annotations: list[str]) -> list[tuple[str, str]]:
+    """(name, type) for every ---@param line of an annotation block."""
+    return [m.groups() for m in map(PARAM_RE.match, annotations) if m]
 
-        for key, value in self.annotations:
-            mdx += f"- {key}: {value}\n"
-        mdx += "---"
+def _return_type(annotations: list[str]):
+    """Type of the first ---@return line of an annotation block, if any."""
+    for line in annotations:
+        m = RETURN_RE.match(line)
+        if m:
+            return m.group(1)
+    return None
 
-        return mdx
+class _Record:
+    """
+    Slotted value object. Strings that repeat across a server (resource
+    names, types, argument names) are interned and sequences are stored as
+    tuples, so records are small, hashable, compare by value, and pickle as
+    just their fields (re-interned when loaded back from the cache).
+    """
+    __slots__ = ()
 
-class Callback:
-    def __init__(self, name: str, args: list[str], annotations: list[tuple[str, str]]):
-        self.name = name
-        self.args = args
-        self.annotations = annotations
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self._fields() == other._fields()
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    def __reduce__(self):
+        return type(self), self._fields()
 
     def __repr__(self):
-        return f"Callback(name={self.name}, args={self.args}, annotations={self.annotations})"
-    
+        return f"{type(self).__name__}({', '.join(f'{name}={getattr(self, name)}' for name in self.__slots__)})"
+
     def to_mdx(self):
-        mdx = dedent(f"""\
-        ### {self.name.split(':')[-1]}
-        
-        Triggered when a player.. #TODO: finish
-        ```lua
-        lib.callback.await('{self.name}', false, {', '.join(self.args)})
-        ```
-        """
-        )
+        return default_renderer().render_to_string(self)
+
+def _text(value):
+    """Strings (and expression text) read out of a table, anything else is dropped."""
+    return value if isinstance(value, str) else None
 
-        for key, value in self.annotations:
-            mdx += f"- {key}: {value}\n"
-        mdx += "---"
+def _pairs(pairs) -> tuple[tuple[str, str], ...]:
+    if isinstance(pairs, dict):
+        pairs = pairs.items()
+    return tuple((intern(key), intern(value)) for key, value in pairs or ())
 
-        return mdx
+class Event(_Record):
+    __slots__ = ('name', 'args', 'annotations', 'line')
 
-class Export:
-    def __init__(self, name: str, args: list[str], arg_types: dict[str, str], return_type: str, resource_name: str):
+    def __init__(self, name: str, args: list[str], annotations: list[tuple[str, str]], line: int = None):
         self.name = name
-        self.args = args
-        self.arg_types = arg_types
-        self.return_type = return_type
-        self.resource_name = resource_name
+        self.args = tuple(map(intern, args))
+        self.annotations = _pairs(annotations)
+        self.line = line
 
-    def __repr__(self):
-        return f"Export(name={self.name}, args={self.args}, arg_types={self.arg_types}, return_type={self.return_type})"
-    
-    def to_mdx(self):
-        mdx = dedent(f"""\
-        ### {self.name.split(':')[-1]}
-        
-        Triggered when a player.. #TODO: finish
-        ```lua
-        exports.{self.resource_name}:{self.name}({', '.join(self.args)})
-        ```
-        """
-        )
+class Callback(_Record):
+    __slots__ = ('name', 'args', 'annotations', 'line')
 
-        for key, value in self.arg_types.items():
-            mdx += f"- {key}: {value}\n"
-        mdx += "---"
+    def __init__(self, name: str, args: list[str], annotations: list[tuple[str, str]], line: int = None):
+        self.name = name
+        self.args = tuple(map(intern, args))
+        self.annotations = _pairs(annotations)
+        self.line = line
 
-        return mdx
+class Export(_Record):
+    __slots__ = ('name', 'args', 'arg_types', 'return_type', 'resource_name', 'line')
 
-class Command:
-    def __init__(self, name: str, help_text: str, params: list[dict[str, str]], parent):
+    def __init__(self, name: str, args: list[str], arg_types, return_type: str, resource_name: str, line: int = None):
+        self.name = name
+        self.args = tuple(map(intern, args))
+        self.arg_types = _pairs(arg_types) or None  # -- (name, type) pairs, None without ---@param lines
+        self.return_type = intern(return_type) if return_type else None
+        self.resource_name = intern(resource_name)
+        self.line = line  # -- of the exports(...) call
+
+class CallSite(_Record):
+    """A use of an event, callback, export or locale key: `TriggerServerEvent('name', ...)`, `exports.res:fn(...)`, `locale('key')`, ..."""
+    __slots__ = ('kind', 'via', 'name', 'target', 'line')
+
+    def __init__(self, kind: str, via: str, name: str, target: str, line: int):
+        self.kind = intern(kind)  # -- 'event', 'callback', 'export' or 'locale'
+        self.via = intern(via)  # -- what made the call, TriggerServerEvent, lib.callback.await, exports, ...
+        self.name = intern(name)
+        self.target = intern(target) if target else None  # -- resource an export is called on, None otherwise
+        self.line = line
+
+class Command(_Record):
+    __slots__ = ('name', 'help_text', 'params', 'restricted', 'aliases', 'resource_name', 'line')
+
+    def __init__(self, name: str, help_text: str, params, restricted, aliases, resource_name: str, line: int = None):
         self.name = name
         self.help_text = help_text
-        self.params = params
-        self.script = parent
-
-    def __repr__(self):
-        return f"Command(name={self.name}, help_text={self.help_text}, params={self.params})"
-    
-    def to_mdx(self):
-        mdx = dedent(f"""\
-        ### {self.name}
-        ```lua
-        exports.{self.resource_name}:{self.name}({', '.join(self.args)})
-        ```
-        """
+        # -- (name, type, help, optional) per parameter
+        self.params = tuple(
+            (intern(param), intern(type_) if type_ else None, help_, bool(optional))
+            for param, type_, help_, optional in params
         )
-
-        for key, value in self.arg_types.items():
-            mdx += f"- {key}: {value}\n"
-        mdx += "---"
-
-        return mdx
+        self.restricted = tuple(map(intern, restricted))  # -- ace groups / permissions allowed to run it
+        self.aliases = tuple(aliases)
+        self.resource_name = intern(resource_name)
+        self.line = line
+
+class Import(_Record):
+    """An `@resource/file` a manifest loads: what the file defines and which of that the importing resource uses."""
+    __slots__ = ('path', 'side', 'found', 'symbols', 'used')
+
+    def __init__(self, path: str, side: str, found: bool, symbols, used):
+        self.path = intern(path)
+        self.side = intern(side)
+        self.found = found
+        self.symbols = tuple(symbols)  # -- (kind, name) per symbol the file defines
+        self.used = tuple(used)
 
 class Script:
-    def __init__(self, script_path: str, resource_name: str):
+    # -- statement-leading name -> extractors that get a look at the token stream there.
+    # -- every extractor shares the one pass over the file, add new ones here. They peek
+    # -- ahead on the stream and may return how many tokens they consumed.
+    EXTRACTORS = {
+        'RegisterNetEvent': ('_extract_event',),
+        'lib': ('_extract_callback', '_extract_callback_call', '_extract_command'),
+        'exports': ('_extract_export', '_extract_export_call'),
+        'TriggerServerEvent': ('_extract_trigger',),
+        'TriggerClientEvent': ('_extract_trigger',),
+        'TriggerEvent': ('_extract_trigger',),
+        'locale': ('_extract_locale',),
+        'Lang': ('_extract_locale',),
+        'function': ('_extract_function',),
+        'local': ('_extract_function',),
+    }
+    # -- any other name might start an assignment: `fn = function` / `Module.fn = function`
+    NAME_EXTRACTORS = ('_extract_assignment',)
+    # -- what each extractor feeds, so a Script asked for some kinds only runs theirs
+    EXTRACTOR_KINDS = {
+        '_extract_event': 'events',
+        '_extract_command': 'commands',
+        '_extract_callback': 'callbacks',
+        '_extract_export': 'exports',
+        '_extract_function': 'exports',
+        '_extract_assignment': 'exports',
+        '_extract_trigger': 'calls',
+        '_extract_callback_call': 'calls',
+        '_extract_export_call': 'calls',
+        '_extract_locale': 'calls',
+    }
+    KINDS = ('events', 'callbacks', 'exports', 'commands', 'calls')
+    # -- a file holding none of a kind's triggers can't produce it, so it isn't lexed for it
+    SCAN_TRIGGERS = {
+        'events': (b'RegisterNetEvent',),
+        'callbacks': (b'callback',),
+        'exports': (b'exports',),
+        'commands': (b'addCommand',),
+        'calls': (b'Trigger', b'callback', b'exports', b'locale', b'Lang'),
+    }
+    _dispatch_tables = {}
+
+    def __init__(self, script_path: str, resource_name: str, cache=None, exists: bool = None, kinds: tuple[str, ...] = None):
+        """
+        Nothing is read until one of events / callbacks / exports / calls is
+        first used; that runs one pass for every kind in *kinds* (all of them
+        by default) and keeps the results.
+        """
         self.resource_name = resource_name
         self.script_path = script_path
-        self.exists = os.path.exists(script_path)
-        self.events = []
-        self.callbacks = []
-        # self.commands = []
-        self.exports = []
-
-        if self.exists:
-            self.events = self._get_events()
-            self.callbacks = self._get_callbacks()
-            # self.commands = self._get_commands()
-            self.exports = self._get_exports()
+        self.cache = cache
+        self.kinds = tuple(kinds or self.KINDS)
+        self.exists = os.path.exists(script_path) if exists is None else exists
+        self._results = {}
 
-        else:
+        if not self.exists:
             print(f"Unable to find script {script_path} in resource {resource_name}")
 
-    def _get_events(self):
-        lua_source = open(self.script_path, 'r').read()
-        block_re = re.compile(
-            r'''
-            (
-                (?:^\s*---@param[^\n]*\n)*  # -- zero or more param lines
-            )
-            ^\s*RegisterNetEvent\(
-                \s*['"]([^'"]+)['"]\s*,       # -- event name
-                \s*function\s*\(([^)]*)\)     # -- arg list
-            ''',
-            re.MULTILINE | re.VERBOSE
-        )
-        param_re = re.compile(r'^---@param\s+(\w+)\s+([^\s]+)', re.MULTILINE)
-        results = [] 
-        for doc_block, event_name, raw_args in block_re.findall(lua_source):
-            params = param_re.findall(doc_block)
-            arg_names = [a.strip() for a in raw_args.split(',') if a.strip()]
-
-            results.append(Event(event_name, arg_names, params))
-
-        return results
-    
-    def _get_callbacks(self):
-        lua_source = open(self.script_path, 'r').read()
-        block_re = re.compile(
-            r'''
-            (
-                (?:^\s*---@param[^\n]*\n)*  # -- zero or more param lines
-            )
-            ^lib\.callback\.register\(
-                \s*['"]([^'"]+)['"]\s*,       # -- event name
-                \s*function\s*\(([^)]*)\)     # -- arg list
-            ''',
-            re.MULTILINE | re.VERBOSE
-        )
-        param_re = re.compile(r'^---@param\s+(\w+)\s+([^\s]+)', re.MULTILINE)
-        results = [] 
-        for doc_block, event_name, raw_args in block_re.findall(lua_source):
-            params = param_re.findall(doc_block)
-            arg_names = [a.strip() for a in raw_args.split(',') if a.strip()]
-
-            results.append(Callback(event_name, arg_names, params))
-
-        return results
-    
-    def _get_commands(self):
-        lua_source = open(self.script_path, 'r').read()
-        add_cmd_re = re.compile(
-            r'''
-            lib\.addCommand\(\s*                  
-                ['"]([^'"]+)['"]\s*,\s*           
-                \{                                
-                    (?:(?!\}\s*,?\s*function).)*? 
-                    (?:                           
-                        \bhelp\s*=\s*([^,}]+)     
-                    )?                            
-                    (?:                           
-                        .*?                       
-                        \bparams\s*=\s*{          
-                        (                         
-                            (?:                   
-                                [^{}]             
-                            | \{[^{}]*\}          
-                            )*
-                        )                         
-                        }                         
-                    )?                            
-                    .*?                           
-                \}                                
-            \s*,\s*function                       
-            ''',
-            re.DOTALL | re.VERBOSE
-        )
-
-        param_re = re.compile(
-            r'''
-            \{[^{}]*?                        
-                \bname\s*=\s*['"]([^'"]+)['"]
-                [^{}]*?                      
-                \btype\s*=\s*['"]([^'"]+)['"]
-                [^{}]*?                      
-                \bhelp\s*=\s*([^,}\n]+)      
-                [^{}]*?                      
-            \}                               
-            ''',
-            re.DOTALL | re.VERBOSE
-        )
-
-        result = []
-
-        for cmd, help_val, params_block in add_cmd_re.findall(lua_source):
-            params = [
-                {'name': n, 'type': t, 'help': h.strip()}
-                for n, t, h in param_re.findall(params_block or '')
-            ]
-            result.append(Command(cmd, help_val.strip(), params))
-
-        return result
-    
-    def _get_exports(self):
-        lua_source = open(self.script_path, 'r').read()
-
-        # ① grab all exports and all functions once
-        export_re = re.compile(r'^[ \t]*exports\(\s*[\'"]([^\'"]+)[\'"]\s*,\s*(\w+)\s*\)', re.MULTILINE)
-        func_re   = re.compile(r'''(?P<ann>(?:^[ \t]*---@.*\n)*)^[ \t]*(?:local[ \t]+)?function[ \t]+(?P<name>\w+)[ \t]*\((?P<args>[^\)]*)\)''', re.MULTILINE)
-        param_re  = re.compile(r'^[ \t]*---@param[ \t]+(\w+)[ \t]+([^\s]+)', re.MULTILINE)
-        return_re = re.compile(r'^[ \t]*---@return[ \t]+([^\s]+)',           re.MULTILINE)
-
-        exports = [(m.start(), m.group(1), m.group(2)) for m in export_re.finditer(lua_source)]
-        funcs   = [(m.start(), m.group('name'), m.group('args'), m.group('ann')) for m in func_re.finditer(lua_source)]
+    @property
+    def events(self) -> list[Event]:
+        return self._result('events')
+
+    @property
+    def callbacks(self) -> list[Callback]:
+        return self._result('callbacks')
+
+    @property
+    def exports(self) -> list[Export]:
+        return self._result('exports')
+
+    @property
+    def commands(self) -> list[Command]:
+        return self._result('commands')
+
+    @property
+    def calls(self) -> list[CallSite]:
+        return self._result('calls')
+
+    def extract(self):
+        """Run the pass for every kind in *kinds* now instead of on first use."""
+        missing = [kind for kind in self.kinds if kind not in self._results]
+        if missing:
+            self._load(missing)
+
+    def extracted(self, kind: str):
+        """Results of *kind* if they've been extracted already, None otherwise. Never reads the file."""
+        return self._results.get(kind)
+
+    def _result(self, kind: str) -> list:
+        if kind not in self._results:
+            # -- asking beyond *kinds* means someone wants the lot, still one more pass at most
+            wanted = self.kinds if kind in self.kinds else self.KINDS
+            self._load([k for k in wanted if k not in self._results])
+        return self._results[kind]
+
+    def _load(self, kinds: list[str]):
+        if not self.exists:
+            self._results.update((kind, []) for kind in kinds)
+            return
 
-        results = []          # one dict per export
+        cached = self.cache.get(self.script_path, 'script') if self.cache else None
+        missing = [kind for kind in kinds if cached is None or kind not in cached]
+        if cached is not None:
+            self._results.update((kind, cached[kind]) for kind in kinds if kind in cached)
+        if not missing:
+            return
 
-        for exp_pos, export_name, func_var in exports:
-            # pick the closest *earlier* function whose name matches the variable in exports(...)
-            candidates = [f for f in funcs if f[0] < exp_pos and f[1] == func_var]
-            if not candidates:
+        self._results.update((kind, []) for kind in missing)
+        with PROFILER.span('script.extract', 'extract', resource=self.resource_name, file=self.script_path):
+            self._scan(missing)
+        if self.cache:
+            # -- one entry per file, holding whatever kinds have been extracted from it so far
+            self.cache.put(self.script_path, 'script', {**(cached or {}), **{kind: self._results[kind] for kind in missing}})
+
+    @classmethod
+    def _dispatch(cls, kinds) -> tuple[dict, tuple, tuple]:
+        """EXTRACTORS, NAME_EXTRACTORS and SCAN_TRIGGERS cut down to *kinds*."""
+        key = frozenset(kinds)
+        if key not in cls._dispatch_tables:
+            def wanted(extractors):
+                return tuple(extractor for extractor in extractors if cls.EXTRACTOR_KINDS[extractor] in key)
+            # -- names keep their (maybe empty) entry, they must never fall through to NAME_EXTRACTORS
+            extractors = {name: wanted(names) for name, names in cls.EXTRACTORS.items()}
+            triggers = tuple(dict.fromkeys(trigger for kind in cls.KINDS if kind in key for trigger in cls.SCAN_TRIGGERS[kind]))
+            cls._dispatch_tables[key] = (extractors, wanted(cls.NAME_EXTRACTORS), triggers)
+        return cls._dispatch_tables[key]
+
+    def _scan(self, kinds: list[str]):
+        # -- the lexer runs over the mapped bytes, so memory stays flat however big the file
+        # -- is and only what gets extracted is ever decoded
+        with open(self.script_path, 'rb') as fh:
+            with PROFILER.span('script.read', 'read', resource=self.resource_name, file=self.script_path):
+                try:
+                    lua_source = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    lua_source = b''  # -- empty files can't be mapped
+                except OSError:
+                    lua_source = fh.read()
+
+            try:
+                extractors, name_extractors, triggers = self._dispatch(kinds)
+                if any(lua_source.find(trigger) != -1 for trigger in triggers):
+                    self._scan_source(lua_source, kinds, extractors, name_extractors)
+            finally:
+                if isinstance(lua_source, mmap.mmap):
+                    lua_source.close()
+
+    def _scan_source(self, lua_source, kinds, extractors_by_name, name_extractors):
+        self._functions = SymbolTable()  # -- name -> (args, annotations) by definition offset
+        self._command_end = -1  # -- where the last command table read ends
+        self._export_refs = []  # -- (pos, line, export name, function variable, inline definition)
+
+        stream = TokenStream(lua_source)
+        doc_block, doc_line = [], -1
+        while True:
+            token = stream.next()
+            if token.kind == EOF:
+                break
+
+            if token.kind == COMMENT:
+                if token.value.startswith('---'):
+                    if token.line != doc_line + 1:
+                        doc_block = []
+                    doc_block.append(token.value)
+                    doc_line = token.line
                 continue
-            _, _, arg_string, ann_block = candidates[-1]
 
-            arg_list   = [a.strip() for a in arg_string.split(',') if a.strip()]
-            param_dict = dict(param_re.findall(ann_block))
-            ret_match  = return_re.search(ann_block)
-            ret_type   = ret_match.group(1) if ret_match else None
+            annotations = doc_block if doc_block and token.line == doc_line + 1 else []
+            doc_block = []
+
+            extractors = extractors_by_name.get(token.value, name_extractors) if token.kind == NAME else None
+            if extractors:
+                # -- an extractor may claim tokens it has matched so nobody sees them twice
+                consumed = max(getattr(self, extractor)(token, stream, annotations) or 0 for extractor in extractors)
+                for _ in range(consumed):
+                    stream.next()
+
+        if 'exports' in kinds:
+            self._resolve_exports()
+            PROFILER.count('matches.functions', len(self._functions))
+            PROFILER.count('matches.unresolved_exports', len(self._export_refs) - len(self.exports))
+        for kind in kinds:
+            PROFILER.count(f'matches.{kind}', len(self._results[kind]))
+        del self._functions, self._export_refs, self._command_end
+
+    def _extract_event(self, token, stream, annotations):
+        # -- RegisterNetEvent('name', function(args)
+        if not stream.match(0, '(') or stream.peek(1).kind != STRING:
+            return
+        if not stream.match(2, ',', 'function'):
+            return
+        args = stream.read_args(4)
+        if args is None:
+            return
+        self.events.append(Event(stream.string(1), args[0], _params(annotations), token.line))
 
-            results.append(Export(export_name, arg_list, param_dict or None, ret_type, self.resource_name))
+    def _extract_callback(self, token, stream, annotations):
+        # -- lib.callback.register('name', function(args)
+        if not stream.match(0, '.', 'callback', '.', 'register', '(') or stream.peek(5).kind != STRING:
+            return
+        if not stream.match(6, ',', 'function'):
+            return
+        args = stream.read_args(8)
+        if args is None:
+            return
+        self.callbacks.append(Callback(stream.string(5), args[0], _params(annotations), token.line))
 
-        return results
+    def _extract_export(self, token, stream, annotations):
+        # -- exports('name', fn) / exports('name', Module.fn) / exports('name', function(args)
+        if not stream.match(0, '(') or stream.peek(1).kind != STRING or not stream.match(2, ','):
+            return
+        export_name = stream.string(1)
 
-class Resource: 
-    def __init__(self, resource_path: str):
-        self.resource_path = resource_path
-        self.manifest = Manifest(resource_path)
-
-        if self.manifest.english_locale and self.manifest.english_locale_path:
-            with open(self.manifest.english_locale_path, encoding='utf-8') as fh:
-                self.locale_data = json.load(fh)
-
-        self.server_scripts = [Script(os.path.join(resource_path, '\\'.join([x for x in script.split('/')])), self.manifest.resource) for script in self.manifest.server_scripts]
-        self.client_scripts = [Script(os.path.join(resource_path, '\\'.join([x for x in script.split('/')])), self.manifest.resource) for script in self.manifest.client_scripts]
-        self.shared_scripts = [Script(os.path.join(resource_path, '\\'.join([x for x in script.split('/')])), self.manifest.resource) for script in self.manifest.shared_scripts]
-
-    def export(self):
-        export_directory = os.path.join(os.getcwd(), 'export', self.manifest.resource)
-        if os.path.exists(export_directory):
-            shutil.rmtree(export_directory, True)
-        
-        os.makedirs(export_directory)
-        
-        self._export_events(export_directory)
-        self._export_exports(export_directory)
-        self._export_callbacks(export_directory)
-
-    def _export_events(self, export_directory):
-        event_export_directory = os.path.join(export_directory, 'events')
-        server_events = itertools.chain.from_iterable([x.events for x in self.server_scripts])
-        client_events = itertools.chain.from_iterable([x.events for x in self.client_scripts])
-        shared_events = itertools.chain.from_iterable([x.events for x in self.shared_scripts])
-
-        if not any(server_events or client_events or shared_events):
-            print("No events found, exiting..")
+        if stream.match(3, 'function'):
+            args = stream.read_args(4)
+            if args is not None:
+                self._export_refs.append((token.start, token.line, export_name, None, (args[0], annotations)))
             return
-        
-        os.makedirs(event_export_directory)
 
-        self._write_to_file(os.path.join(event_export_directory, 'server.mdx'), server_events)
-        self._write_to_file(os.path.join(event_export_directory, 'client.mdx'), client_events)
-        self._write_to_file(os.path.join(event_export_directory, 'shared.mdx'), shared_events)
+        func_var = stream.read_name(3)
+        if func_var is None or not stream.match(func_var[1], ')'):
+            return
+        self._export_refs.append((token.start, token.line, export_name, func_var[0], None))
+
+    def _extract_command(self, token, stream, annotations):
+        # -- lib.addCommand('name' / {'name', 'alias'}, { help = ..., params = { ... }, restricted = ... }, function(source, args)
+        # -- tables are read token by token with brace matching, so a command costs what its tokens cost.
+        # -- Its tokens are still seen by the other extractors (locale calls in a help text, ...), but a
+        # -- command nested inside one already read isn't read again. A table that never closes claims
+        # -- nothing either: read_table gives up at the next statement (or after a capped lookahead), and
+        # -- commands up to there aren't tried again, so a run of broken ones stays linear.
+        if token.start < self._command_end or not stream.match(0, '.', 'addCommand', '('):
+            return
+        if stream.peek(3).kind == STRING:
+            names, offset = [stream.string(3)], 4
+        else:
+            names, offset = stream.read_table(3)
+            if names is None:
+                self._command_end = stream.peek(offset - 1).end
+                return
+            if not isinstance(names, list) or not names or not all(isinstance(name, str) for name in names):
+                return
+        if not stream.match(offset, ','):
+            return
 
-    def _export_exports(self, export_directory):
-        event_export_directory = os.path.join(export_directory, 'exports')
-        server_exports = itertools.chain.from_iterable([x.exports for x in self.server_scripts])
-        client_exports = itertools.chain.from_iterable([x.exports for x in self.client_scripts])
-        shared_exports = itertools.chain.from_iterable([x.exports for x in self.shared_scripts])
+        properties = {}
+        if stream.match(offset + 1, '{'):
+            properties, end = stream.read_table(offset + 1)
+            if properties is None:
+                self._command_end = stream.peek(end - 1).end
+                return
+            if not isinstance(properties, dict):
+                properties = {}
+        else:
+            end = offset + 1
+            if not (stream.match(end, 'false') or stream.match(end, 'nil') or stream.match(end, 'function')):
+                return
+
+        params = []
+        for param in properties.get('params') or ():
+            if isinstance(param, dict) and isinstance(param.get('name'), str):
+                params.append((param['name'], _text(param.get('type')), _text(param.get('help')), param.get('optional') is True))
+        restricted = properties.get('restricted')
+        if restricted is True:
+            restricted = [f'command.{names[0]}']  # -- plain `true` means the command's own ace
+        elif isinstance(restricted, str):
+            restricted = [restricted]
+        elif not isinstance(restricted, list):
+            restricted = []
+
+        self.commands.append(Command(names[0], _text(properties.get('help')), params,
+                                     [group for group in restricted if isinstance(group, str)], names[1:], self.resource_name, token.line))
+        self._command_end = stream.peek(end - 1).end
+
+    def _extract_trigger(self, token, stream, annotations):
+        # -- TriggerServerEvent('name', ...) / TriggerClientEvent('name', target, ...) / TriggerEvent('name', ...)
+        if stream.match(0, '(') and stream.peek(1).kind == STRING:
+            self.calls.append(CallSite('event', token.value, stream.string(1), None, token.line))
+
+    def _extract_callback_call(self, token, stream, annotations):
+        # -- lib.callback.await('name', ...) / lib.callback('name', ...)
+        if stream.match(0, '.', 'callback', '.', 'await', '(') and stream.peek(5).kind == STRING:
+            self.calls.append(CallSite('callback', 'lib.callback.await', stream.string(5), None, token.line))
+        elif stream.match(0, '.', 'callback', '(') and stream.peek(3).kind == STRING:
+            self.calls.append(CallSite('callback', 'lib.callback', stream.string(3), None, token.line))
+
+    def _extract_export_call(self, token, stream, annotations):
+        # -- exports.resource:fn(...) / exports['resource']:fn(...)
+        if stream.match(0, '.') and stream.peek(1).kind == NAME and stream.match(2, ':') and stream.peek(3).kind == NAME:
+            self.calls.append(CallSite('export', 'exports', stream.peek(3).value, stream.peek(1).value, token.line))
+        elif stream.match(0, '[') and stream.peek(1).kind == STRING and stream.match(2, ']', ':') and stream.peek(4).kind == NAME:
+            self.calls.append(CallSite('export', 'exports', stream.peek(4).value, stream.string(1), token.line))
+
+    def _extract_locale(self, token, stream, annotations):
+        # -- locale('key', ...) / Lang:t('key', ...)
+        if token.value == 'locale':
+            if stream.match(0, '(') and stream.peek(1).kind == STRING:
+                self.calls.append(CallSite('locale', 'locale', stream.string(1), None, token.line))
+        elif stream.match(0, ':', 't', '(') and stream.peek(3).kind == STRING:
+            self.calls.append(CallSite('locale', 'Lang:t', stream.string(3), None, token.line))
+
+    def _extract_function(self, token, stream, annotations):
+        # -- function name(args) / function Module.name(args) / local function name(args)
+        # -- local name = function(args)
+        offset = 1 if token.value == 'local' else 0
+        if offset and not stream.match(0, 'function'):
+            name = stream.read_name(0)
+            if name is None or not stream.match(name[1], '=', 'function'):
+                return
+            args = stream.read_args(name[1] + 2)
+        else:
+            name = stream.read_name(offset)
+            if name is None:
+                return
+            args = stream.read_args(name[1])
+        if args is None:
+            return
+        self._functions.add(name[0], token.start, (args[0], annotations))
+        return args[1]
 
-        if not any(server_exports or client_exports or shared_exports):
-            print("No exports found, exiting..")
+    def _extract_assignment(self, token, stream, annotations):
+        # -- name = function(args) / Module.name = function(args)
+        following = stream.peek()
+        if following.kind != OP or following.value not in ('=', '.'):
+            return
+        name = stream.read_name(-1, token)
+        if name is None or not stream.match(name[1], '=', 'function'):
+            return
+        args = stream.read_args(name[1] + 2)
+        if args is None:
             return
-        
-        os.makedirs(event_export_directory)
+        self._functions.add(name[0], token.start, (args[0], annotations))
+        return args[1]
+
+    def _resolve_exports(self):
+        for exp_pos, line, export_name, func_var, definition in self._export_refs:
+            # pick the closest *earlier* function whose name matches the variable in exports(...)
+            if definition is None:
+                definition = self._functions.closest_before(func_var, exp_pos)
+            if definition is None:
+                continue
+            arg_list, annotations = definition
 
-        self._write_to_file(os.path.join(event_export_directory, 'server.mdx'), server_exports)
-        self._write_to_file(os.path.join(event_export_directory, 'client.mdx'), client_exports)
-        self._write_to_file(os.path.join(event_export_directory, 'shared.mdx'), shared_exports)
+            param_dict = dict(_params(annotations))
+            ret_type = _return_type(annotations)
 
-    def _export_callbacks(self, export_directory):
-        event_export_directory = os.path.join(export_directory, 'callbacks')
-        server_callbacks = itertools.chain.from_iterable([x.callbacks for x in self.server_scripts])
-        client_callbacks = itertools.chain.from_iterable([x.callbacks for x in self.client_scripts])
-        shared_callbacks = itertools.chain.from_iterable([x.callbacks for x in self.shared_scripts])
+            self.exports.append(Export(export_name, arg_list, param_dict or None, ret_type, self.resource_name, line))
 
-        if not any(server_callbacks or client_callbacks or shared_callbacks):
-            print("No callbacks found, exiting..")
-            return
-        
-        os.makedirs(event_export_directory)
-
-        self._write_to_file(os.path.join(event_export_directory, 'server.mdx'), server_callbacks)
-        self._write_to_file(os.path.join(event_export_directory, 'client.mdx'), client_callbacks)
-        self._write_to_file(os.path.join(event_export_directory, 'shared.mdx'), shared_callbacks)
-
-    def _write_to_file(self, file_path, content):
-        if content:
-            file_handle = open(file_path, 'w+')
-            for item in content:
-                file_handle.write(item.to_mdx())
\ No newline at end of file
+class Resource: 
+    SECTIONS = ('events', 'exports', 'callbacks', 'commands')
+    SIDES = ('server', 'client', 'shared')
+
+    def __init__(self, resource_path: str, cache=None, renderer=None, index=None, *, sections: tuple[str, ...] = None, sides: tuple[str, ...] = None,
+                 language: str = None, imports=None, call_sites: bool = False):
+        """
+        Only the manifest is read up front. Each side's scripts are set up
+        the first time they're asked for, and with *sections* / *sides* given
+        export() only extracts, renders and touches those pages. Locale files
+        are read when something is localized, in *language* (en by default).
+        `@resource/file` imports are looked up through the ImportResolver
+        *imports*, which may be shared by every resource of a run. Call sites
+        are extracted in the same pass as the symbols whenever something will
+        read them (the index, the imports pages, or *call_sites* for a locale
+        report), never in a second one.
+        """
+        self.resource_path = resource_path
+        self.cache = cache
+        self.renderer = renderer or default_renderer()
+        self.index = index  # -- SymbolIndex the pages list "used by" from, if any
+        self.sections = tuple(section for section in self.SECTIONS if section in (sections or self.SECTIONS))
+        self.sides = tuple(side for side in self.SIDES if side in (sides or self.SIDES))
+        self.language = language
+        self.imports = imports
+        self._side_scripts = {}
+        self._locales = None
+        self.manifest = Manifest(resource_path, cache)
+        self.export_directory = os.path.join(os.getcwd(), 'export', self.manifest.resource)
+        # -- imports/<side>.mdx pages list what the scripts use of each import, so they need the call sites
+        self.imports_pages = imports is not None and self.sections == self.SECTIONS and any(self.manifest.imports.values())
+        self.script_kinds = self.sections + ('calls',) if call_sites or index is not None or self.imports_pages else self.sections
+
+    @property
+    def locales(self) -> Locales:
+        if self._locales is None:
+            self._locales = Locales(self.resource_path, self.manifest.file_index, self.cache, self.language)
+        return self._locales
+
+    @property
+    def server_scripts(self) -> list[Script]:
+        return self.side_scripts('server')
+
+    @property
+    def client_scripts(self) -> list[Script]:
+        return self.side_scripts('client')
+
+    @property
+    def shared_scripts(self) -> list[Script]:
+        return self.side_scripts('shared')
+
+    def _script(self, relative_path: str) -> 'Script':
+        path = os.path.join(self.resource_path, *relative_path.split('/'))
+        if self.imports is not None:
+            # -- a file some resource imported is only parsed once
+            script = self.imports.shared(path, self.manifest.resource, parse=False)
+            if script is not None:
+                return script
+        return Script(path, self.manifest.resource, self.cache, self.manifest.file_index.exists(relative_path), self.script_kinds)
+
+    def scripts(self):
+        """Scripts of the selected sides."""
+        return itertools.chain.from_iterable(self.side_scripts(side) for side in self.sides)
+
+    def side_scripts(self, side: str) -> list[Script]:
+        if side not in self._side_scripts:
+            self._side_scripts[side] = [self._script(script) for script in getattr(self.manifest, f'{side}_scripts')]
+        return self._side_scripts[side]
+
+    def reload_script(self, script_path: str) -> list[tuple[str, str]]:
+        """
+        Re-parse one script in place. Returns the (section, side) pages whose
+        symbols changed because of it; ('imports', side) when its call sites
+        moved, since every imports page lists what the whole resource uses.
+        """
+        pages = []
+        for side in self.sides:
+            scripts = self.side_scripts(side)
+            for index, script in enumerate(scripts):
+                if script.script_path != script_path:
+                    continue
+                scripts[index] = Script(script_path, self.manifest.resource, self.cache, os.path.exists(script_path), self.script_kinds)
+                # -- a section never extracted from the old version can't be compared, so it counts as changed
+                pages += [(section, side) for section in self.sections
+                          if script.extracted(section) is None or script.extracted(section) != getattr(scripts[index], section)]
+                if self.imports_pages and (script.extracted('calls') is None or script.extracted('calls') != scripts[index].calls):
+                    pages += [('imports', side_) for side_ in self.sides if self.manifest.imports[side_] and ('imports', side_) not in pages]
+        return pages
+
+    def export(self, export_directory: str = None, output_format: str = 'mdx', writer=None) -> dict:
+        """
+        Render every docs page in memory and hand it to an OutputWriter, which
+        only touches files whose content changed and drops pages whose symbols
+        are gone. Returns the writer's stats. With *output_format* json/ndjson
+        every symbol is streamed into a single symbols.json/.ndjson instead.
+        Any other *writer* with the same interface (a PageCollector, ...) can
+        take the pages instead.
+        """
+        if output_format != 'mdx':
+            suffix = SUFFIXES[output_format]
+            writer = writer or OutputWriter(export_directory or self.export_directory, managed_suffixes=(suffix,))
+            with writer.open(f'symbols{suffix}') as page:
+                stream = RecordStream(page.write, output_format)
+                self.export_records(stream)
+                stream.close()
+            return writer.stats()
+
+        writer = writer or OutputWriter(export_directory or self.export_directory)
+
+        for section in self.sections:
+            for side in self.sides:
+                self._export_page(writer, section, side)
+
+        if self.sections == self.SECTIONS:
+            for side in self.sides:
+                self._export_imports(writer, side)
+
+        # -- a filtered export leaves the pages it wasn't asked about alone
+        if self.sections == self.SECTIONS and self.sides == self.SIDES:
+            return writer.finish()
+        return writer.stats()
+
+    def locale_report(self) -> dict:
+        """Per language, the locale keys the scripts use but it lacks and the keys it has that nothing uses."""
+        used = {call.name for side in self.SIDES for script in self.side_scripts(side) for call in script.calls if call.kind == 'locale'}
+        return self.locales.report(used)
+
+    def imported(self, side: str) -> list[Import]:
+        """What each `@resource/file` *side* imports defines, and which of it this resource's scripts use."""
+        imports = self.manifest.imports[side]
+        if not imports or self.imports is None:
+            return []
+        # -- an imported file runs inside the importing resource, so what it exports is exported by this
+        # -- resource. Export calls name their resource, events and callbacks are global
+        used = {(call.kind, call.target, call.name) for side_ in self.SIDES for script in self.side_scripts(side_) for call in script.calls}
+        records = []
+        for import_ in imports:
+            script = self.imports.script(import_)
+            symbols, depends = [], []
+            if script is not None:
+                for section, kind in KINDS.items():
+                    for item in getattr(script, section):
+                        symbols.append((kind, item.name))
+                        if (kind, self.manifest.resource if kind == 'export' else None, item.name) in used:
+                            depends.append((kind, item.name))
+            records.append(Import(import_, side, script is not None, symbols, depends))
+        return records
+
+    def _localize(self, section: str, item):
+        # -- a command's help texts are often `locale('key')`, render the string itself
+        if section != 'commands' or not self.manifest.locales:
+            return item
+        localize = self.locales.localize
+        return Command(item.name, localize(item.help_text),
+                       [(name, type_, localize(help_), optional) for name, type_, help_, optional in item.params],
+                       item.restricted, item.aliases, item.resource_name, item.line)
+
+    def records(self):
+        """Every symbol of the selected sections and sides as a JSON-ready dict, one at a time."""
+        for section in self.sections:
+            for side in self.sides:
+                for script in self.side_scripts(side):
+                    relative = os.path.relpath(script.script_path, self.resource_path).replace(os.sep, '/')
+                    for item in getattr(script, section):
+                        yield symbol_record(self._localize(section, item), section, self.manifest.resource, side, relative)
+
+    def export_records(self, stream: RecordStream) -> int:
+        """Write records() into *stream*, which several resources may share. Returns how many were written."""
+        written = 0
+        with PROFILER.span('render.records', 'render', resource=self.manifest.resource):
+            for record in self.records():
+                stream.write(record)
+                written += 1
+        return written
+
+    def export_pages(self, pages: list[tuple[str, str]], export_directory: str = None) -> dict:
+        """Re-render only the given (section, side) pages, section 'imports' being the imports pages."""
+        writer = OutputWriter(export_directory or self.export_directory)
+        for section, side in pages:
+            if section == 'imports':
+                self._export_imports(writer, side)
+            else:
+                self._export_page(writer, section, side)
+        return writer.stats()
+
+    def render_items(self, section: str, items, write):
+        """Render symbols of one section through *write*, localized and with their users if there's an index."""
+        items = (self._localize(section, item) for item in items)
+        if self.index is None:
+            self.renderer.render_all(items, write)
+        else:
+            for item in items:
+                self.renderer.render(item, write, used_by=self.index.used_by(section, item, self.manifest.resource))
+
+    def render_script(self, script_path: str) -> str:
+        """The MDX of every symbol one script defines, section by section, or None when no selected side lists it."""
+        for script in self.scripts():
+            if script.script_path == script_path:
+                parts = []
+                for section in self.sections:
+                    self.render_items(section, getattr(script, section), parts.append)
+                return ''.join(parts)
+        return None
+
+    def _export_imports(self, writer, side):
+        relative_path = f'imports/{side}.mdx'
+        imported = self.imported(side)
+        if imported:
+            with PROFILER.span('render.page', 'render', resource=self.manifest.resource, page=f'{self.manifest.resource}/{relative_path}'):
+                with writer.open(relative_path) as page:
+                    self.renderer.render_all(imported, page.write)
+        else:
+            writer.discard(relative_path)
+
+    def _export_page(self, writer, section, side):
+        items = [item for script in self.side_scripts(side) for item in getattr(script, section)]
+        relative_path = f'{section}/{side}.mdx'
+        if items:
+            with PROFILER.span('render.page', 'render', resource=self.manifest.resource, page=f'{self.manifest.resource}/{relative_path}'):
+                with writer.open(relative_path) as page:
+                    self.render_items(section, items, page.write)
+        else:
+            writer.discard(relative_path)
@@ -0,0 +1,189 @@
+import os
+import sqlite3
+from lib.ParseCache import TOOL_VERSION
+from lib.Profiler import PROFILER
+from lib.JsonExport import KINDS
+
+DEFAULT_INDEX_PATH = 'qbox-doc-index.sqlite'
+SCHEMA_VERSION = 2
+
+_SCHEMA = '''
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    side TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    relative TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    UNIQUE (path, side)
+);
+CREATE TABLE definitions (
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    line INTEGER
+);
+CREATE TABLE calls (
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    kind TEXT NOT NULL,
+    via TEXT NOT NULL,
+    target TEXT,
+    name TEXT NOT NULL,
+    line INTEGER NOT NULL
+);
+CREATE INDEX files_resource ON files (resource);
+CREATE INDEX definitions_name ON definitions (name, kind);
+CREATE INDEX definitions_file ON definitions (file_id);
+CREATE INDEX calls_name ON calls (name, kind, target);
+CREATE INDEX calls_file ON calls (file_id);
+'''
+
+
+class SymbolIndex:
+    """
+    SQLite index of every event, callback and export defined across resources
+    and of every place they're used (TriggerServerEvent, lib.callback.await,
+    exports.res:fn, ...). Files are upserted one at a time and skipped while
+    their size and mtime are unchanged, so re-indexing a server only costs
+    what changed. Several worker processes may write to it at once.
+    """
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # -- the serve mode answers from several threads, one at a time
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._ensure_schema()
+
+    def __repr__(self):
+        return f"SymbolIndex(path={self.path})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        self.conn.close()
+
+    def _ensure_schema(self):
+        with self.conn:
+            if self.conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION:
+                return
+            # -- an index from another version of the schema is rebuilt from scratch
+            for table in ('calls', 'definitions', 'files'):
+                self.conn.execute(f'DROP TABLE IF EXISTS {table}')
+            self.conn.executescript(_SCHEMA)
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def update_resource(self, resource) -> int:
+        """
+        Bring the rows of one Resource up to date: changed scripts are
+        re-inserted, scripts the manifest no longer lists are dropped.
+        Returns how many files were (re)indexed.
+        """
+        name = resource.manifest.resource
+        updated = 0
+        with PROFILER.span('index.update', 'index', resource=name), self.conn:
+            known = {(path, side): (file_id, size, mtime_ns, version) for file_id, path, side, size, mtime_ns, version in self.conn.execute(
+                'SELECT id, path, side, size, mtime_ns, version FROM files WHERE resource = ?', (name,))}
+            kept = set()
+            for side in resource.SIDES:
+                for script in resource.side_scripts(side):
+                    try:
+                        stat = os.stat(script.script_path)
+                    except OSError:
+                        continue
+                    key = (script.script_path, side)
+                    kept.add(key)
+                    row = known.get(key)
+                    if row and row[1:] == (stat.st_size, stat.st_mtime_ns, TOOL_VERSION):
+                        continue
+                    relative = os.path.relpath(script.script_path, resource.resource_path).replace(os.sep, '/')
+                    self._upsert(row[0] if row else None, script, side, name, relative, stat)
+                    updated += 1
+
+            for key, row in known.items():
+                if key not in kept:
+                    self._delete(row[0])
+        PROFILER.count('index.files', updated)
+        return updated
+
+    def _upsert(self, file_id, script, side: str, resource: str, relative: str, stat):
+        values = (script.script_path, side, resource, relative, stat.st_size, stat.st_mtime_ns, TOOL_VERSION)
+        if file_id is None:
+            file_id = self.conn.execute(
+                'INSERT INTO files (path, side, resource, relative, size, mtime_ns, version) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                values).lastrowid
+        else:
+            self.conn.execute(
+                'UPDATE files SET path = ?, side = ?, resource = ?, relative = ?, size = ?, mtime_ns = ?, version = ? WHERE id = ?',
+                values + (file_id,))
+            self.conn.execute('DELETE FROM definitions WHERE file_id = ?', (file_id,))
+            self.conn.execute('DELETE FROM calls WHERE file_id = ?', (file_id,))
+
+        self.conn.executemany('INSERT INTO definitions (file_id, kind, name, line) VALUES (?, ?, ?, ?)', [
+            (file_id, kind, item.name, item.line)
+            for section, kind in KINDS.items()
+            for item in getattr(script, section)
+        ])
+        self.conn.executemany('INSERT INTO calls (file_id, kind, via, target, name, line) VALUES (?, ?, ?, ?, ?, ?)', [
+            (file_id, call.kind, call.via, call.target, call.name, call.line)
+            for call in script.calls
+        ])
+
+    def _delete(self, file_id: int):
+        self.conn.execute('DELETE FROM definitions WHERE file_id = ?', (file_id,))
+        self.conn.execute('DELETE FROM calls WHERE file_id = ?', (file_id,))
+        self.conn.execute('DELETE FROM files WHERE id = ?', (file_id,))
+
+    def retain_resources(self, names) -> int:
+        """Forget every resource not in *names*. Returns how many files were dropped."""
+        names = set(names)
+        with self.conn:
+            stale = [file_id for file_id, resource in self.conn.execute('SELECT id, resource FROM files') if resource not in names]
+            for file_id in stale:
+                self._delete(file_id)
+        return len(stale)
+
+    def definitions(self, name: str) -> list[tuple]:
+        """(kind, resource, relative path, line, side) of every definition of *name*."""
+        rows = self.conn.execute(
+            'SELECT d.kind, f.resource, f.relative, d.line, f.side FROM definitions d JOIN files f ON f.id = d.file_id '
+            'WHERE d.name = ? ORDER BY f.resource, f.relative, d.line, f.side', (name,)).fetchall()
+        # -- `resource:fn` also names an export
+        resource, _, export = name.partition(':')
+        if export and ':' not in export:
+            rows += self.conn.execute(
+                'SELECT d.kind, f.resource, f.relative, d.line, f.side FROM definitions d JOIN files f ON f.id = d.file_id '
+                "WHERE d.name = ? AND d.kind = 'export' AND f.resource = ? ORDER BY f.relative, d.line, f.side", (export, resource)).fetchall()
+        return rows
+
+    def callers(self, kind: str, name: str, target: str = None) -> list[tuple]:
+        """(via, resource, relative path, line) of every call site of one symbol."""
+        query = ('SELECT c.via, f.resource, f.relative, c.line FROM calls c JOIN files f ON f.id = c.file_id '
+                 'WHERE c.name = ? AND c.kind = ?')
+        params = (name, kind)
+        if kind == 'export':
+            query += ' AND c.target = ?'
+            params += (target,)
+        # -- a script listed under several sides has one row per side, its calls only count once
+        return list(dict.fromkeys(self.conn.execute(query + ' ORDER BY f.resource, f.relative, c.line', params)))
+
+    def lookup(self, name: str) -> list[tuple]:
+        """Every call site of *name* as an event, a callback or (`resource:fn`) an export."""
+        rows = [('event',) + row for row in self.callers('event', name)]
+        rows += [('callback',) + row for row in self.callers('callback', name)]
+        resource, _, export = name.partition(':')
+        if export and ':' not in export:
+            rows += [('export',) + row for row in self.callers('export', export, resource)]
+        return rows
+
+    def used_by(self, section: str, item, resource: str) -> list[str]:
+        """`resource (path:line)` of every call site of a documented symbol, for its docs page."""
+        return [f'{caller} ({relative}:{line})' for _, caller, relative, line in self.callers(KINDS[section], item.name, resource)]
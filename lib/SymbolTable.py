@@ -0,0 +1,37 @@
+from bisect import bisect_left, insort
+from typing import Any, Optional
+
+
+class SymbolTable:
+    """
+    Per-file table of function definitions: name -> definition offsets kept
+    sorted, so "closest definition before this point" is a bisect instead of
+    a scan over every function in the file.
+    """
+    def __init__(self):
+        self._offsets: dict[str, list[int]] = {}
+        self._definitions: dict[str, dict[int, Any]] = {}
+
+    def __len__(self):
+        return sum(len(offsets) for offsets in self._offsets.values())
+
+    def __contains__(self, name: str):
+        return name in self._offsets
+
+    def add(self, name: str, offset: int, definition: Any):
+        offsets = self._offsets.setdefault(name, [])
+        if not offsets or offsets[-1] < offset:
+            offsets.append(offset)  # -- the scanner hands definitions over in file order
+        else:
+            insort(offsets, offset)
+        self._definitions.setdefault(name, {})[offset] = definition
+
+    def closest_before(self, name: str, offset: int) -> Optional[Any]:
+        """Definition of *name* with the greatest offset still below *offset*."""
+        offsets = self._offsets.get(name)
+        if not offsets:
+            return None
+        index = bisect_left(offsets, offset)
+        if index == 0:
+            return None
+        return self._definitions[name][offsets[index - 1]]
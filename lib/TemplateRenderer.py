@@ -0,0 +1,146 @@
+import os
+import re
+from typing import Callable, Iterable
+
+DEFAULT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+TEMPLATE_SUFFIX = '.mdx'
+
+# -- {{ expr|filter }} prints, {% for a, b in expr %} / {% if expr %} / {% else %} / {% endfor %} / {% endif %}
+_TAG_RE = re.compile(r'(\{\{.*?\}\}|\{%.*?%\})', re.DOTALL)
+_FOR_RE = re.compile(r'^for\s+(\w+(?:\s*,\s*\w+)*)\s+in\s+(.+)$')
+_EXPR_RE = re.compile(r'^\w+(?:\s*\|\s*\w+)*$')
+
+
+def _text(value) -> str:
+    return '' if value is None else str(value)
+
+
+FILTERS = {
+    'short': lambda value: _text(value).split(':')[-1],
+    'join': lambda value: ', '.join(value or ()),
+    'items': lambda value: value.items() if isinstance(value, dict) else (value or ()),
+    'upper': lambda value: _text(value).upper(),
+    'lower': lambda value: _text(value).lower(),
+}
+
+
+class TemplateError(Exception):
+    pass
+
+
+def compile_template(name: str, source: str) -> Callable:
+    """
+    Turn a template into a Python function `render(item, write, context)`
+    once, so rendering a symbol is a straight run of write() calls with no
+    parsing or string concatenation left to do. Fields are looked up in
+    *context* first, then on the item.
+    """
+    code = ['def render(item, write, context):']
+    indent = 1
+    scopes = [set()]  # -- loop variables visible at each nesting level
+    blocks = []
+
+    def expression(expr: str) -> str:
+        expr = expr.strip()
+        if not _EXPR_RE.match(expr):
+            raise TemplateError(f'{name}: unsupported expression {{{{ {expr} }}}}')
+        field, *filters = [part.strip() for part in expr.split('|')]
+        local = any(field in scope for scope in scopes)
+        value = f'v_{field}' if local else f'(context[{field!r}] if {field!r} in context else getattr(item, {field!r}, None))'
+        for filter_name in filters:
+            if filter_name not in FILTERS:
+                raise TemplateError(f'{name}: unknown filter {filter_name!r}')
+            value = f'FILTERS[{filter_name!r}]({value})'
+        return value
+
+    for part in _TAG_RE.split(source):
+        if not part:
+            continue
+        pad = '    ' * indent
+        if part.startswith('{{'):
+            code.append(f'{pad}write(_text({expression(part[2:-2])}))')
+        elif part.startswith('{%'):
+            tag = part[2:-2].strip()
+            for_match = _FOR_RE.match(tag)
+            if for_match:
+                names = [n.strip() for n in for_match.group(1).split(',')]
+                code.append(f'{pad}for {", ".join("v_" + n for n in names)} in {expression(for_match.group(2))}:')
+                scopes.append(set(names))
+                blocks.append('for')
+                indent += 1
+            elif tag.startswith('if '):
+                code.append(f'{pad}if {expression(tag[3:])}:')
+                scopes.append(set())
+                blocks.append('if')
+                indent += 1
+            elif tag == 'else' and blocks and blocks[-1] == 'if':
+                code.append(f'{pad}pass')  # -- the if branch may be empty
+                code.append(f'{"    " * (indent - 1)}else:')
+                blocks[-1] = 'else'  # -- a second {% else %} is an error
+            elif tag == 'else' and blocks and blocks[-1] == 'else':
+                raise TemplateError(f'{name}: more than one {{% else %}} in an {{% if %}}')
+            elif tag in ('endfor', 'endif') and blocks and blocks[-1].replace('else', 'if') == tag[3:]:
+                code.append(f'{pad}pass')
+                blocks.pop()
+                scopes.pop()
+                indent -= 1
+            else:
+                raise TemplateError(f'{name}: unexpected tag {{% {tag} %}}')
+        else:
+            code.append(f'{pad}write({part!r})')
+
+    if blocks:
+        raise TemplateError(f'{name}: unclosed {{% {blocks[-1]} %}}')
+
+    namespace = {'FILTERS': FILTERS, '_text': _text}
+    exec(compile('\n'.join(code), f'<template {name}>', 'exec'), namespace)
+    return namespace['render']
+
+
+class TemplateRenderer:
+    """
+    One compiled template per symbol kind (event.mdx, callback.mdx, ...),
+    loaded from the bundled templates folder. Files of the same name in
+    *template_dir* override the bundled ones.
+    """
+    def __init__(self, template_dir: str = None):
+        self.template_dir = template_dir
+        self._templates = {}
+
+        for directory in (DEFAULT_TEMPLATE_DIR, template_dir):
+            if not directory:
+                continue
+            for file_name in sorted(os.listdir(directory)):
+                if file_name.endswith(TEMPLATE_SUFFIX):
+                    with open(os.path.join(directory, file_name), encoding='utf-8') as fh:
+                        kind = file_name[:-len(TEMPLATE_SUFFIX)]
+                        self._templates[kind] = compile_template(file_name, fh.read())
+
+    def __repr__(self):
+        return f"TemplateRenderer(template_dir={self.template_dir}, kinds={sorted(self._templates)})"
+
+    def render(self, item, write: Callable[[str], None], **context):
+        kind = type(item).__name__.lower()
+        try:
+            template = self._templates[kind]
+        except KeyError:
+            raise TemplateError(f'No template for {kind}') from None
+        template(item, write, context)
+
+    def render_all(self, items: Iterable, write: Callable[[str], None]):
+        for item in items:
+            self.render(item, write)
+
+    def render_to_string(self, item, **context) -> str:
+        parts = []
+        self.render(item, parts.append, **context)
+        return ''.join(parts)
+
+
+_default_renderer = None
+
+def default_renderer() -> TemplateRenderer:
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = TemplateRenderer()
+    return _default_renderer
@@ -0,0 +1,128 @@
+import os
+import time
+from lib.ResourceAnalyzer import Resource
+
+SUCCESS = '\u2705'  # Check mark
+FAILURE = '\u274C'  # Cross mark
+
+
+def _stat(path: str):
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+class WatchedResource:
+    """
+    One resource plus the stat snapshot of everything it was built from:
+    the manifest, each script, its locale files and imported files and every
+    folder (a new or removed file shows up as a folder mtime change, which
+    can change what a glob expands to).
+    """
+    def __init__(self, resource_path: str, cache=None, renderer=None, index=None, *, sections=None, sides=None, language=None, imports=None):
+        self.resource_path = resource_path
+        self.cache = cache
+        self.renderer = renderer
+        self.index = index
+        self.sections = sections
+        self.sides = sides
+        self.language = language
+        self.imports = imports
+        self.load()
+
+    def load(self):
+        self.resource = Resource(self.resource_path, self.cache, self.renderer, self.index, sections=self.sections, sides=self.sides,
+                                 language=self.language, imports=self.imports)
+        self.manifest_files = {os.path.join(self.resource_path, 'fxmanifest.lua')}
+        self.manifest_files.update(self.resource.manifest.file_index.directories)
+        # -- an edited translation changes the localized help texts, rebuild like a manifest change
+        self.manifest_files.update(self.resource.locales.path(language) for language in self.resource.locales.languages)
+        if self.imports:
+            resolved = (self.imports.resolve(import_) for imports in self.resource.manifest.imports.values() for import_ in imports)
+            self.manifest_files.update(path for _, path in filter(None, resolved))
+        self.script_files = set()
+        for script in self.resource.scripts():
+            # -- reload_script compares against what was extracted before: a section never extracted
+            # -- would count as changed, and re-rendering it parses every other script of the side
+            script.extract()
+            self.script_files.add(script.script_path)
+        self.snapshot = {path: _stat(path) for path in self.manifest_files | self.script_files}
+
+    def changed(self) -> list[str]:
+        changed = []
+        for path, before in self.snapshot.items():
+            now = _stat(path)
+            if now != before:
+                self.snapshot[path] = now
+                changed.append(path)
+        return changed
+
+    def refresh(self, changed: list[str]):
+        """
+        Bring the model up to date with the *changed* paths. Returns the
+        (section, side) pages whose symbols moved, or None when the whole
+        resource had to be reloaded.
+        """
+        if any(path in self.manifest_files for path in changed):
+            self.load()
+            return None
+        pages = []
+        for path in changed:
+            pages += [page for page in self.resource.reload_script(path) if page not in pages]
+        return pages
+
+
+class Watcher:
+    """
+    Poll a set of resources and keep their docs up to date. A changed script
+    is re-parsed on its own and only the pages whose symbols moved are
+    re-rendered; a changed manifest (or resource folder) rebuilds that one
+    resource.
+    """
+    def __init__(self, resource_paths: list[str], cache=None, interval: float = 0.25, renderer=None, index=None, *, sections=None, sides=None,
+                 output_format: str = 'mdx', language: str = None, imports=None):
+        self.interval = interval
+        self.index = index
+        self.output_format = output_format
+        self.watched = [WatchedResource(path, cache, renderer, index, sections=sections, sides=sides, language=language, imports=imports)
+                        for path in resource_paths]
+
+    def run(self):
+        print(f'Watching {len(self.watched)} resource(s), press Ctrl+C to stop')
+        try:
+            while True:
+                self.poll()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print('Stopped watching')
+
+    def poll(self):
+        for watched in self.watched:
+            changed = watched.changed()
+            if not changed:
+                continue
+
+            started = time.perf_counter()
+            name = watched.resource.manifest.resource
+            try:
+                pages = watched.refresh(changed)
+                if self.index:
+                    self.index.update_resource(watched.resource)
+                if pages is None:
+                    written = watched.resource.export(output_format=self.output_format)
+                    what = 'resource rebuilt'
+                else:
+                    if self.output_format != 'mdx':
+                        # -- one symbols file per resource, rewritten whenever any page would be
+                        written = watched.resource.export(output_format=self.output_format) if pages else watched.resource.export_pages([])
+                    else:
+                        written = watched.resource.export_pages(pages)
+                    what = ', '.join(f'{section}/{side}.mdx' for section, side in pages) or 'no doc changes'
+            except Exception as e:
+                print(f'{FAILURE} {name}: {type(e).__name__}: {e}')
+                continue
+
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f'{SUCCESS} {name}: {what} ({written["written"]} written, {written["removed"]} removed) in {elapsed:.0f} ms')
@@ -0,0 +1,9 @@
+import os
+
+
+def write_file(path, text: str) -> str:
+    """Write *text* to *path*, creating its folders, and return the path as a string."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write(text)
+    return str(path)
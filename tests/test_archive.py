@@ -0,0 +1,52 @@
+import os
+import time
+import tarfile
+import zipfile
+import pytest
+from lib.BatchRunner import run_batch
+from tests import write_file
+
+
+def _server(tmp_path) -> str:
+    root = tmp_path / 'resources'
+    for i in range(6):
+        name = f'res{i}'
+        write_file(root / f'[group{i % 2}]' / name / 'fxmanifest.lua', "fx_version 'cerulean'\nshared_script 'shared.lua'\nserver_script 'server.lua'\n")
+        write_file(root / f'[group{i % 2}]' / name / 'shared.lua', f"exports('Get{i}', function(a) end)\n")
+        write_file(root / f'[group{i % 2}]' / name / 'server.lua', f"RegisterNetEvent('{name}:event', function(a, b) end)\n"
+                                                                  f"lib.callback.register('{name}:cb', function(source) end)\n")
+    return str(root)
+
+
+def _build(tmp_path, root: str, jobs: int, suffix: str) -> bytes:
+    path = tmp_path / f'docs-{jobs}{suffix}'
+    run_batch(root, jobs, str(tmp_path / 'summary.json'), archive_path=str(path))
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize('suffix', ['.zip', '.tar.gz'])
+def test_archive_is_byte_identical_across_job_counts(tmp_path, monkeypatch, suffix):
+    monkeypatch.chdir(tmp_path)
+    root = _server(tmp_path)
+    single = _build(tmp_path, root, 1, suffix)
+    time.sleep(1.1)  # -- a timestamp leaking into the archive would show up as a difference
+    assert _build(tmp_path, root, 2, suffix) == single
+    assert not os.path.exists(tmp_path / 'export' / 'res0')
+
+
+def test_archive_lists_every_page_in_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _build(tmp_path, _server(tmp_path), 2, '.zip')
+    with zipfile.ZipFile(tmp_path / 'docs-2.zip') as archive:
+        names = archive.namelist()
+    assert names[:4] == ['res0/events/server.mdx', 'res0/exports/shared.mdx', 'res0/callbacks/server.mdx', 'res2/events/server.mdx']
+    assert len(names) == 18
+
+
+def test_tar_members_are_normalised(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _build(tmp_path, _server(tmp_path), 1, '.tar.gz')
+    with tarfile.open(tmp_path / 'docs-1.tar.gz') as archive:
+        members = archive.getmembers()
+    assert {(member.uid, member.gid, member.uname, member.gname) for member in members} == {(0, 0, '', '')}
+    assert len({member.mtime for member in members}) == 1
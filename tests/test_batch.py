@@ -0,0 +1,40 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+from tests import write_file
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+def _server(tmp_path, broken: bool = False) -> str:
+    root = tmp_path / 'resources'
+    for name in ('one', 'two'):
+        write_file(root / name / 'fxmanifest.lua', "fx_version 'cerulean'\nserver_script 'main.lua'\n")
+        write_file(root / name / 'main.lua', f"RegisterNetEvent('{name}:event', function() end)\n")
+    if broken:
+        # -- a manifest that can't be read: the symlink points at itself
+        os.makedirs(root / 'broken')
+        os.symlink('fxmanifest.lua', root / 'broken' / 'fxmanifest.lua')
+    return str(root)
+
+
+def _run(tmp_path, root: str, *args) -> tuple[int, dict]:
+    summary = tmp_path / 'summary.json'
+    process = subprocess.run([sys.executable, APP, root, '--batch', '--no-cache', '--summary', str(summary), *args],
+                             cwd=tmp_path, capture_output=True, text=True)
+    return process.returncode, json.loads(summary.read_text())
+
+
+def test_exit_status_is_zero_when_everything_builds(tmp_path):
+    status, summary = _run(tmp_path, _server(tmp_path), '-j', '1')
+    assert (status, summary['resources'], summary['failed']) == (0, 2, 0)
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_exit_status_is_non_zero_when_a_resource_fails(tmp_path, jobs):
+    status, summary = _run(tmp_path, _server(tmp_path, broken=True), '-j', jobs)
+    assert (status, summary['resources'], summary['failed']) == (1, 3, 1)
+    failed = next(result for result in summary['results'] if not result['ok'])
+    assert failed['resource'] == 'broken' and 'error' in failed
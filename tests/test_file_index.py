@@ -0,0 +1,63 @@
+import os
+import glob
+import pytest
+from lib.FileIndex import FileIndex
+
+FILES = [
+    'fxmanifest.lua',
+    'client/main.lua',
+    'client/utils.lua',
+    'client/.hidden.lua',
+    'client/nested/deep.lua',
+    'client/nested/deeper/deepest.lua',
+    'server/main.lua',
+    'server/data.json',
+    'shared/config.lua',
+    'shared/[brackets]/odd.lua',
+    'locales/en.json',
+    'locales/de.json',
+    '.hidden/secret.lua',
+]
+
+PATTERNS = [
+    '*.lua',
+    'client/*.lua',
+    'client/**/*.lua',
+    'client/**',
+    '**/*.lua',
+    '**/main.lua',
+    's*/*.lua',
+    'c?ient/[a-m]*.lua',
+    'client/[!m]*.lua',
+    'locales/*.json',
+    'shared/*/odd.lua',
+    'server/main.lua',
+    'missing/*.lua',
+]
+
+
+@pytest.fixture
+def resource(tmp_path):
+    for relative in FILES:
+        path = tmp_path.joinpath(*relative.split('/'))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('')
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_match_agrees_with_glob(resource, pattern):
+    expected = sorted(
+        os.path.relpath(path, resource).replace(os.sep, '/')
+        for path in glob.glob(os.path.join(resource, pattern), recursive=True)
+        if os.path.isfile(path)
+    )
+    assert FileIndex(resource).match(pattern) == expected
+
+
+def test_exists_and_listdir(resource):
+    index = FileIndex(resource)
+    assert index.exists('./client\\main.lua')
+    assert not index.exists('client/missing.lua')
+    assert index.listdir('locales') == ['de.json', 'en.json']
+    assert index.listdir('nothing') is None
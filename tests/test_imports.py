@@ -0,0 +1,49 @@
+import os
+from lib.ResourceAnalyzer import Resource, Script
+from lib.BatchRunner import discover
+from lib.Imports import ImportResolver
+from lib.Watcher import WatchedResource
+from tests import write_file
+
+
+def test_imports_are_extracted_in_one_pass(tmp_path, monkeypatch):
+    root = tmp_path / 'resources'
+    write_file(root / 'shared_res' / 'fxmanifest.lua', "fx_version 'cerulean'\ngame 'gta5'\nshared_script 'lib.lua'\n")
+    lib_path = write_file(root / 'shared_res' / 'lib.lua', "exports('Helper', function(a) end)\n")
+    write_file(root / 'user_res' / 'fxmanifest.lua', "fx_version 'cerulean'\ngame 'gta5'\nshared_scripts { '@shared_res/lib.lua', 'main.lua' }\n")
+    main_path = write_file(root / 'user_res' / 'main.lua', "RegisterNetEvent('user:event', function() exports.shared_res:Helper(1) end)\n")
+
+    scans = []
+    scan = Script._scan
+
+    def counting_scan(self, kinds):
+        scans.append(os.path.realpath(self.script_path))
+        return scan(self, kinds)
+
+    monkeypatch.setattr(Script, '_scan', counting_scan)
+    resource = Resource(str(root / 'user_res'), imports=ImportResolver(discover(str(root))))
+    resource.export(str(tmp_path / 'export'))
+
+    assert sorted(scans) == sorted([os.path.realpath(lib_path), os.path.realpath(main_path)])
+    assert os.path.exists(tmp_path / 'export' / 'imports' / 'shared.mdx')
+
+
+def test_watch_refreshes_imports_pages_when_calls_change(tmp_path):
+    root = tmp_path / 'resources'
+    write_file(root / 'shared_res' / 'fxmanifest.lua', "fx_version 'cerulean'\ngame 'gta5'\nshared_script 'lib.lua'\n")
+    write_file(root / 'shared_res' / 'lib.lua', "exports('Helper', function() end)\nRegisterNetEvent('lib:event', function() end)\n")
+    write_file(root / 'user_res' / 'fxmanifest.lua', "fx_version 'cerulean'\ngame 'gta5'\nclient_scripts { '@shared_res/lib.lua', 'main.lua' }\n")
+    main_path = write_file(root / 'user_res' / 'main.lua', "exports.user_res:Helper()\nTriggerEvent('lib:event')\n")
+    export = tmp_path / 'export'
+
+    watched = WatchedResource(str(root / 'user_res'), imports=ImportResolver(discover(str(root))))
+    watched.resource.export(str(export))
+    assert 'Depends on:\n- event: lib:event\n- export: Helper\n' in (export / 'imports' / 'client.mdx').read_text()
+
+    write_file(main_path, "print('nothing imported is used')\n")
+    os.utime(main_path, ns=(0, os.stat(main_path).st_mtime_ns + 10**9))
+    pages = watched.refresh(watched.changed())
+    assert pages == [('imports', 'client')]
+    watched.resource.export_pages(pages, str(export))
+    page = (export / 'imports' / 'client.mdx').read_text()
+    assert 'Depends on' not in page and 'None of its symbols are used here.' in page
@@ -0,0 +1,81 @@
+import io
+import os
+import json
+import pytest
+from lib.BatchRunner import run_batch
+from lib.JsonExport import RecordStream, SCHEMA, SCHEMA_VERSION, merge
+from lib.ResourceAnalyzer import Resource
+from tests import write_file
+
+RECORDS = [
+    {'kind': 'event', 'name': 'a:b', 'help': 'quote " and\nnewline'},
+    {'kind': 'export', 'name': 'Ünïcode', 'args': ['x', 'y']},
+    {'kind': 'command', 'name': 'cmd', 'restricted': []},
+]
+
+
+def _records(text: str, output_format: str) -> list[dict]:
+    if output_format == 'json':
+        document = json.loads(text)
+        assert (document['schema'], document['version']) == (SCHEMA, SCHEMA_VERSION)
+        return document['symbols']
+    header, *lines = text.splitlines()
+    assert json.loads(header) == {'schema': SCHEMA, 'version': SCHEMA_VERSION}
+    return [json.loads(line) for line in lines]
+
+
+def _stream(records, output_format: str) -> str:
+    out = io.StringIO()
+    stream = RecordStream(out.write, output_format)
+    for record in records:
+        stream.write(record)
+    stream.close()
+    return out.getvalue()
+
+
+@pytest.mark.parametrize('output_format', ['json', 'ndjson'])
+@pytest.mark.parametrize('records', [RECORDS, RECORDS[:1], []])
+def test_stream_is_valid(records, output_format):
+    assert _records(_stream(records, output_format), output_format) == records
+
+
+@pytest.mark.parametrize('output_format', ['json', 'ndjson'])
+def test_merge_round_trip(tmp_path, output_format):
+    paths = []
+    for i, records in enumerate([RECORDS[:2], [], RECORDS[2:]]):
+        path = tmp_path / f'{i}.{output_format}'
+        path.write_text(_stream(records, output_format), encoding='utf-8')
+        paths.append(str(path))
+    out = io.StringIO()
+    stream = RecordStream(out.write, output_format)
+    merge(paths, stream)
+    stream.close()
+    assert _records(out.getvalue(), output_format) == RECORDS
+
+
+def _server(tmp_path) -> str:
+    root = tmp_path / 'resources'
+    for name in ('one', 'two'):
+        write_file(root / name / 'fxmanifest.lua', "fx_version 'cerulean'\ngame 'gta5'\nserver_script 'main.lua'\n")
+        write_file(root / name / 'main.lua', f"RegisterNetEvent('{name}:event', function(a) end)\nexports('{name}', function() end)\n")
+    return str(root)
+
+
+def test_resource_records_are_valid_json(tmp_path):
+    root = _server(tmp_path)
+    out = io.StringIO()
+    stream = RecordStream(out.write, 'json')
+    Resource(os.path.join(root, 'one')).export_records(stream)
+    stream.close()
+    assert [(r['kind'], r['name'], r['file'], r['args']) for r in _records(out.getvalue(), 'json')] == [
+        ('event', 'one:event', 'main.lua', ['a']), ('export', 'one', 'main.lua', [])]
+
+
+@pytest.mark.parametrize('output_format', ['json', 'ndjson'])
+def test_batch_output_leaves_no_symbols_files(tmp_path, monkeypatch, output_format):
+    root = _server(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    out = io.StringIO()
+    run_batch(root, 1, str(tmp_path / 'summary.json'), output_format=output_format, records_out=out)
+    assert sorted(r['name'] for r in _records(out.getvalue(), output_format)) == ['one', 'one:event', 'two', 'two:event']
+    assert not os.path.exists(tmp_path / 'export')
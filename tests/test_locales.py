@@ -0,0 +1,34 @@
+import json
+import pytest
+from lib.FileIndex import FileIndex
+from lib.Locales import Locales
+
+
+@pytest.fixture
+def locales(tmp_path):
+    (tmp_path / 'locales').mkdir()
+    (tmp_path / 'locales' / 'en.json').write_text(json.dumps({'help': {'give': 'Give an item'}, 'only_en': 'English'}))
+    (tmp_path / 'locales' / 'de.json').write_text(json.dumps({'help': {'give': 'Gegenstand geben'}}))
+    return lambda language=None: Locales(str(tmp_path), FileIndex(str(tmp_path)), language=language)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("locale('help.give')", 'Give an item'),
+    ('Lang:t("help.give")', 'Give an item'),
+    ("locale('help.give', name)", 'Give an item'),
+    ("locale('help.give', GetName(id))", 'Give an item'),
+    ("locale('missing.key')", "locale('missing.key')"),
+    ("locale('help.give') .. ' (admin only)'", "locale('help.give') .. ' (admin only)'"),
+    ("locale('help.give', x) .. f(y)", "locale('help.give', x) .. f(y)"),
+    ("locale('help.give'):upper()", "locale('help.give'):upper()"),
+    ('plain help', 'plain help'),
+])
+def test_localize_whole_calls_only(locales, text, expected):
+    assert locales().localize(text) == expected
+
+
+def test_language_falls_back_to_default(locales):
+    german = locales('de')
+    assert german.localize("locale('help.give')") == 'Gegenstand geben'
+    assert german.localize("locale('only_en')") == 'English'
+    assert locales('fr').language == 'en'
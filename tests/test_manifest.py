@@ -0,0 +1,89 @@
+import re
+import pytest
+from lib.ManifestReader import Manifest, parse_directives
+from tests import write_file
+
+
+def _manifest(tmp_path, source: str, files=()) -> Manifest:
+    for relative in files:
+        write_file(tmp_path.joinpath(*relative.split('/')), '')
+    write_file(tmp_path / 'fxmanifest.lua', source)
+    return Manifest(str(tmp_path))
+
+
+def test_imports_are_split_from_scripts(tmp_path):
+    manifest = _manifest(tmp_path, '''
+shared_scripts { '@ox_lib/init.lua', '@other/shared.lua', 'shared.lua' }
+client_script '@qbx_core/modules/playerdata.lua'
+client_script 'client.lua'
+server_scripts { '@oxmysql/lib/MySQL.lua', 'server.lua' }
+''', files=['shared.lua', 'client.lua', 'server.lua'])
+    assert manifest.imports == {
+        'shared': ['@ox_lib/init.lua', '@other/shared.lua'],
+        'client': ['@qbx_core/modules/playerdata.lua'],
+        'server': ['@oxmysql/lib/MySQL.lua'],
+    }
+    assert (manifest.shared_scripts, manifest.client_scripts, manifest.server_scripts) == (['shared.lua'], ['client.lua'], ['server.lua'])
+    assert (manifest.uses_ox_lib, manifest.uses_qbx_lib, manifest.uses_oxmysql, manifest.uses_qbx_playerdata) == (True, False, True, True)
+
+
+def _regex_scripts(content: str, name: str) -> list[str]:
+    """How scripts were read before the tokenizer: one `name 'x'` line, else the first `names { ... }` block."""
+    match = re.search(rf"^{name}\s*['|\"](.*)['|\"]\s*$", content, re.MULTILINE)
+    if match:
+        return [match.group(1)]
+    match = re.search(rf"^{name}s\s*\{{([^}}]*)\}}", content, re.MULTILINE | re.DOTALL)
+    return re.findall(r'[\"\']([^\"\']+)[\"\']', match.group(1)) if match else []
+
+
+def _scripts(directives, name: str) -> list[str]:
+    return [value for directive in directives if directive.name in (name, f'{name}s') for value in directive.values]
+
+
+@pytest.mark.parametrize('content', [
+    "fx_version 'cerulean'\ngame 'gta5'\nshared_script 'config.lua'\nclient_script \"client.lua\"\n",
+    "client_scripts {\n    'a.lua',\n    \"b/*.lua\",\n}\nserver_scripts { 'server/**/*.lua' }\n",
+    "description 'x'\nshared_scripts {\n  '@ox_lib/init.lua',\n  'shared/*.lua'\n}\nserver_script 'main.lua'\n",
+])
+def test_directives_agree_with_the_old_regexes_on_simple_manifests(content):
+    directives = parse_directives(content)
+    for name in ('shared_script', 'client_script', 'server_script'):
+        assert _scripts(directives, name) == _regex_scripts(content, name)
+
+
+def test_directive_forms():
+    directives = parse_directives('''
+fx_version 'cerulean'
+shared_script 'one.lua'
+shared_script "two.lua" -- a second one, the regexes only saw the first
+client_scripts {
+    'a.lua', -- trailing comment
+    --[[ 'commented.lua', ]]
+    [[long/path.lua]],
+    [==[long/eq.lua]==],
+    { 'nested.lua' },
+}
+server_script('call.lua')
+data_file 'DLC_ITYP_REQUEST' 'stream/props.ytyp'
+description [[
+multi line]]
+lua54 'yes'
+''')
+    assert _scripts(directives, 'shared_script') == ['one.lua', 'two.lua']
+    assert _scripts(directives, 'client_script') == ['a.lua', 'long/path.lua', 'long/eq.lua', 'nested.lua']
+    assert _scripts(directives, 'server_script') == ['call.lua']
+    by_name = {directive.name: directive for directive in directives}
+    assert by_name['data_file'].values == ['DLC_ITYP_REQUEST', 'stream/props.ytyp']
+    assert by_name['description'].values == ['multi line']
+    assert (by_name['lua54'].values, by_name['lua54'].line) == (['yes'], 16)
+
+
+def test_manifest_merges_repeated_directives(tmp_path):
+    manifest = _manifest(tmp_path, '''
+description 'Test' -- with a comment
+shared_script 'a.lua'
+shared_scripts { 'b/*.lua' }
+shared_script 'c.lua'
+''', files=['a.lua', 'b/one.lua', 'b/two.lua', 'c.lua'])
+    assert manifest.description == 'Test'
+    assert manifest.shared_scripts == ['a.lua', 'b/one.lua', 'b/two.lua', 'c.lua']
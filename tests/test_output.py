@@ -0,0 +1,45 @@
+import os
+from lib.OutputWriter import OutputWriter
+from lib.ResourceAnalyzer import Resource
+
+
+def _resource(tmp_path) -> str:
+    resource_path = tmp_path / 'res'
+    (resource_path / 'server').mkdir(parents=True)
+    (resource_path / 'fxmanifest.lua').write_text("fx_version 'cerulean'\ngame 'gta5'\nserver_script 'server/*.lua'\n")
+    (resource_path / 'server' / 'main.lua').write_text(
+        "RegisterNetEvent('res:event', function(a) end)\n"
+        "lib.callback.register('res:callback', function(source) end)\n"
+        "exports('Thing', function(x) end)\n"
+    )
+    return str(resource_path)
+
+
+def test_rebuild_without_changes_writes_nothing(tmp_path):
+    resource_path, export = _resource(tmp_path), str(tmp_path / 'export')
+    first = Resource(resource_path).export(export)
+    assert first['written'] > 0 and first['bytes_written'] > 0
+
+    mtimes = {path: os.stat(os.path.join(export, path)).st_mtime_ns for path in os.listdir(export)}
+    second = Resource(resource_path).export(export)
+    assert second['written'] == 0 and second['bytes_written'] == 0 and second['removed'] == 0
+    assert second['unchanged'] == first['written']
+    assert {path: os.stat(os.path.join(export, path)).st_mtime_ns for path in os.listdir(export)} == mtimes
+
+
+def test_writer_only_rewrites_changed_pages(tmp_path):
+    writer = OutputWriter(str(tmp_path))
+    writer.write('a.mdx', 'same')
+    writer.write('b.mdx', 'old')
+    (tmp_path / 'stale.mdx').write_text('gone')
+    (tmp_path / 'notes.txt').write_text('kept')
+    writer.finish()
+
+    writer = OutputWriter(str(tmp_path))
+    writer.write('a.mdx', 'same')
+    writer.write('b.mdx', 'new')
+    stats = writer.finish()
+    assert (stats['written'], stats['unchanged'], stats['bytes_written']) == (1, 1, len('new'))
+    assert (tmp_path / 'b.mdx').read_text() == 'new'
+    assert not (tmp_path / 'stale.mdx').exists()
+    assert (tmp_path / 'notes.txt').exists()
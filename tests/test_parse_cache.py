@@ -0,0 +1,46 @@
+import os
+from lib.ParseCache import ParseCache
+
+
+def _cached(tmp_path):
+    source = tmp_path / 'script.lua'
+    source.write_text('local a = 1\n')
+    cache = ParseCache(str(tmp_path / 'cache'))
+    cache.put(str(source), 'script', {'events': []})
+    return source, cache
+
+
+def test_hit_while_unchanged(tmp_path):
+    source, cache = _cached(tmp_path)
+    assert cache.get(str(source), 'script') == {'events': []}
+    assert cache.get(str(source), 'other') is None
+
+
+def test_size_change_invalidates(tmp_path):
+    source, cache = _cached(tmp_path)
+    stat = os.stat(source)
+    source.write_text('local a = 12\n')
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))  # -- same mtime, only the size moved
+    assert cache.get(str(source), 'script') is None
+
+
+def test_mtime_change_checks_content(tmp_path):
+    source, cache = _cached(tmp_path)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.get(str(source), 'script') == {'events': []}  # -- touched, same content
+
+    source.write_text('local b = 1\n')  # -- same size, different content
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert cache.get(str(source), 'script') is None
+
+
+def test_depends_on_invalidates(tmp_path):
+    source, cache = _cached(tmp_path)
+    folder = tmp_path / 'folder'
+    folder.mkdir()
+    cache.put(str(source), 'manifest', 'value', depends_on=[str(folder)])
+    assert cache.get(str(source), 'manifest') == 'value'
+    stat = os.stat(folder)
+    os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.get(str(source), 'manifest') is None
@@ -0,0 +1,52 @@
+from tests import write_file
+from lib.ResourceAnalyzer import Script
+
+
+def _script(tmp_path, source: str) -> Script:
+    return Script(write_file(tmp_path / 'script.lua', source), 'res')
+
+
+def test_comments_and_strings_are_not_symbols(tmp_path):
+    script = _script(tmp_path, '''
+-- RegisterNetEvent('commented:out', function() end)
+--[[
+RegisterNetEvent('long:comment', function() end)
+]]
+local text = "RegisterNetEvent('in:string', function() end)"
+local long = [==[ lib.callback.register('in:longstring', function() end) ]==]
+RegisterNetEvent('real:event', function(a, b) end)
+lib.callback.register('real:callback', function(source) end)
+''')
+    assert [(event.name, event.args) for event in script.events] == [('real:event', ('a', 'b'))]
+    assert [callback.name for callback in script.callbacks] == ['real:callback']
+
+
+def test_annotations_and_exports(tmp_path):
+    script = _script(tmp_path, '''
+---@param id number
+---@return table
+local function GetPlayer(id) return {} end
+exports('GetPlayer', GetPlayer)
+exports('Inline', function(a) end)
+''')
+    exports = {export.name: export for export in script.exports}
+    assert set(exports) == {'GetPlayer', 'Inline'}
+    assert exports['GetPlayer'].arg_types == (('id', 'number'),)
+    assert exports['GetPlayer'].return_type == 'table'
+
+
+def test_unclosed_command_table_hides_nothing(tmp_path):
+    script = _script(tmp_path, '''
+lib.addCommand('broken', { help = 'never closed',
+
+RegisterNetEvent('after:broken', function() end)
+lib.addCommand('good', { help = 'works', restricted = true }, function(source) end)
+''')
+    assert [event.name for event in script.events] == ['after:broken']
+    assert [(command.name, command.restricted) for command in script.commands] == [('good', ('command.good',))]
+
+
+def test_deeply_nested_command_table(tmp_path):
+    depth = 3000
+    script = _script(tmp_path, "lib.addCommand('deep', { help = 'x', params = " + '{' * depth + '}' * depth + " }, function() end)\n")
+    assert [(command.name, command.help_text) for command in script.commands] == [('deep', 'x')]
@@ -0,0 +1,58 @@
+import os
+import pytest
+from lib.ResourceAnalyzer import Resource
+from lib.SymbolIndex import SymbolIndex
+from tests import write_file
+
+
+def _touch(path: str, text: str):
+    write_file(path, text)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def server(tmp_path):
+    root = tmp_path / 'resources'
+    write_file(root / 'core' / 'fxmanifest.lua', "fx_version 'cerulean'\nserver_scripts { 'a.lua', 'b.lua' }\n")
+    write_file(root / 'core' / 'a.lua', "exports('GetThing', function() end)\nRegisterNetEvent('core:event', function() end)\n")
+    write_file(root / 'core' / 'b.lua', "RegisterNetEvent('core:other', function() end)\n")
+    write_file(root / 'user' / 'fxmanifest.lua', "fx_version 'cerulean'\nclient_script 'main.lua'\n")
+    write_file(root / 'user' / 'main.lua', "exports.core:GetThing()\nTriggerServerEvent('core:event')\n")
+    with SymbolIndex(str(tmp_path / 'index.sqlite')) as index:
+        yield root, index
+
+
+def _update(index, path) -> int:
+    return index.update_resource(Resource(str(path), call_sites=True))
+
+
+def test_unchanged_files_are_skipped(server):
+    root, index = server
+    assert (_update(index, root / 'core'), _update(index, root / 'user')) == (2, 1)
+    assert (_update(index, root / 'core'), _update(index, root / 'user')) == (0, 0)
+    assert [row[:3] for row in index.definitions('core:GetThing')] == [('export', 'core', 'a.lua')]
+    assert [row[:3] for row in index.lookup('core:event')] == [('event', 'TriggerServerEvent', 'user')]
+
+
+def test_changed_file_is_reindexed(server):
+    root, index = server
+    _update(index, root / 'core')
+    _update(index, root / 'user')
+    _touch(str(root / 'user' / 'main.lua'), "TriggerServerEvent('core:other')\n")
+    assert (_update(index, root / 'core'), _update(index, root / 'user')) == (0, 1)
+    assert index.lookup('core:event') == []
+    assert [row[:3] for row in index.lookup('core:other')] == [('event', 'TriggerServerEvent', 'user')]
+
+
+def test_dropped_scripts_and_resources_are_deleted(server):
+    root, index = server
+    _update(index, root / 'core')
+    _update(index, root / 'user')
+    _touch(str(root / 'core' / 'fxmanifest.lua'), "fx_version 'cerulean'\nserver_script 'a.lua'\n")
+    assert _update(index, root / 'core') == 0
+    assert index.definitions('core:other') == []
+    assert [row[:2] for row in index.definitions('core:event')] == [('event', 'core')]
+
+    assert index.retain_resources(['core']) == 1
+    assert index.lookup('core:event') == []
+    assert index.definitions('core:event') != []
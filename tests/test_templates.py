@@ -0,0 +1,25 @@
+import pytest
+from lib.TemplateRenderer import compile_template, TemplateError
+
+
+def _render(source: str, **context) -> str:
+    out = []
+    compile_template('test', source)(None, out.append, context)
+    return ''.join(out)
+
+
+def test_empty_branches():
+    assert _render('{% if a %}{% else %}x{% endif %}', a=False) == 'x'
+    assert _render('{% if a %}{% else %}x{% endif %}', a=True) == ''
+    assert _render('{% for v in items %}{% if v %}{{ v }}{% else %}-{% endif %}{% endfor %}', items=[1, 0, 2]) == '1-2'
+
+
+@pytest.mark.parametrize('source', [
+    '{% if a %}x{% else %}y{% else %}z{% endif %}',
+    '{% for v in a %}{% else %}{% endfor %}',
+    '{% if a %}x',
+    '{% endif %}',
+])
+def test_malformed_templates_raise(source):
+    with pytest.raises(TemplateError):
+        compile_template('test', source)
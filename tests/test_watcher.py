@@ -0,0 +1,47 @@
+import os
+from lib.ResourceAnalyzer import Resource, Script
+from lib.Watcher import WatchedResource
+from tests import write_file
+
+
+def _edit(path: str, text: str):
+    write_file(path, text)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+
+
+def test_script_edit_reparses_only_that_script(tmp_path, monkeypatch):
+    resource_path = tmp_path / 'res'
+    write_file(resource_path / 'fxmanifest.lua', "fx_version 'cerulean'\ngame 'gta5'\nserver_scripts { 'server/*.lua' }\n")
+    main_path = write_file(resource_path / 'server' / 'main.lua', "exports('Thing', function() end)\n")
+    write_file(resource_path / 'server' / 'other.lua', "lib.callback.register('res:cb', function(source) end)\n"
+                                                      "lib.addCommand('cmd', { help = 'x' }, function(source) end)\n")
+    export = tmp_path / 'export'
+    Resource(str(resource_path)).export(str(export))  # -- app.py builds before it starts watching
+    watched = WatchedResource(str(resource_path))
+
+    scans = []
+    scan = Script._scan
+
+    def counting_scan(self, kinds):
+        scans.append(os.path.basename(self.script_path))
+        return scan(self, kinds)
+
+    monkeypatch.setattr(Script, '_scan', counting_scan)
+    _edit(main_path, "exports('Thing', function() end)\nRegisterNetEvent('res:event', function() end)\n")
+    pages = watched.refresh(watched.changed())
+    assert pages == [('events', 'server')]
+    watched.resource.export_pages(pages, str(export))
+    assert scans == ['main.lua']
+    assert 'res:event' in (export / 'events' / 'server.mdx').read_text()
+
+
+def test_manifest_edit_reloads_the_resource(tmp_path):
+    resource_path = tmp_path / 'res'
+    manifest = write_file(resource_path / 'fxmanifest.lua', "fx_version 'cerulean'\ngame 'gta5'\nserver_script 'a.lua'\n")
+    write_file(resource_path / 'a.lua', "RegisterNetEvent('a', function() end)\n")
+    write_file(resource_path / 'b.lua', "RegisterNetEvent('b', function() end)\n")
+    watched = WatchedResource(str(resource_path))
+
+    _edit(manifest, "fx_version 'cerulean'\ngame 'gta5'\nserver_scripts { 'a.lua', 'b.lua' }\n")
+    assert watched.refresh(watched.changed()) is None
+    assert [event.name for script in watched.resource.server_scripts for event in script.events] == ['a', 'b']